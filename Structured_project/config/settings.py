@@ -87,6 +87,19 @@ WALLONN,,No,No
 SI_TRADE_COUNT_THRESHOLD = 26
 SI_PERCENTAGE_THRESHOLD = 0.025
 
+# Schema validation
+SCHEMA_SAMPLE_ROWS = 500  # Rows sampled from each workbook before the full load
+MIN_DATE_PARSE_RATE = 0.95  # Minimum share of sampled dates that must parse
+MIN_ISIN_VALID_RATE = 0.95  # Minimum share of sampled ISINs matching the ISIN format
+TRADE_REQUIRED_COLUMNS = ['ISIN', 'ISSUER', 'ISSUER_FULLNAME', 'COUNTERPART', 'M_TRN_DATE', 'M_SPLIT_INI']
+ESMA_SI_REQUIRED_COLUMNS = ['ISIN', 'Calculation From Date', 'Total number of transactions executed in the EU']
 
-
-
+# Database export
+DATABASE_FILENAME = "processed_data.db"
+DATABASE_TABLES = {
+    'trade_source': 'trade_source',
+    'trade_source_scope': 'trade_source_scope',
+    'result_df': 'fs_review_by_isin',
+    'issuer_review': 'fs_review_by_issuer'
+}
+DATABASE_INDEX_COLUMNS = ['ISIN', 'ISSUER', 'Period']
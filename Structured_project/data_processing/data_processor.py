@@ -14,13 +14,14 @@ Date: 2024-09-23
 """
 
 
-import pandas as pd
+import numpy as np
 import pandas as pd
 import logging
 import os
 from datetime import datetime, date
 from config.settings import HARD_CODED_DATA
-from utils.helpers import determine_period, update_report_textbox
+from utils.helpers import determine_period, normalize_isins, update_report_textbox
+from data_processing.schema_validator import SchemaValidator
 
 
 
@@ -73,9 +74,15 @@ class DataProcessor:
             # Validate inputs
             self._validate_inputs()
 
+            # Validate column schema on a sample before the full load
+            self._validate_schema()
+
             # Load data
             self._load_data()
 
+            # Clean ISIN join keys once for every input
+            self._normalize_isins()
+
             # Add 'Period' column to esma_si_df
             self._add_period_to_esma_si()
 
@@ -116,6 +123,21 @@ class DataProcessor:
 
         logging.info("All input files are validated and exist.")
 
+    def _validate_schema(self):
+        """
+        Checks required columns, dtypes, date parse rates and ISIN format on a sample
+        of each input, so malformed files fail before the full load.
+
+        Raises:
+            SchemaValidationError: If any input does not match the expected schema.
+        """
+        SchemaValidator(
+            self.esma_si_df,
+            self.trade_source_file,
+            self.trade_source_scope_file,
+            self.esma_threshold_file
+        ).validate()
+
     def _load_data(self):
         """
         Loads Trade_Source, Trade_Source_Scope, and ESMA_Threshold data into DataFrames.
@@ -129,6 +151,27 @@ class DataProcessor:
         self.trade_source_scope = pd.read_excel(self.trade_source_scope_file)
         logging.info("Loaded Trade_Source and Trade_Source_Scope data.")
 
+    def _normalize_isins(self):
+        """
+        Normalizes the 'ISIN' column of every input once and flags invalid codes.
+
+        Trade data gets an 'ISIN Valid' column ('Yes'/'No') based on format and check
+        digit. Invalid codes are kept, so the review still sees every trade.
+        """
+        for name in ['trade_source', 'trade_source_scope']:
+            df = getattr(self, name)
+            df['ISIN'], valid = normalize_isins(df['ISIN'])
+            df['ISIN Valid'] = np.where(valid, 'Yes', 'No')
+            invalid_count = int((~valid).sum())
+            if invalid_count:
+                logging.warning(f"{invalid_count} rows in {name} have an invalid ISIN.")
+
+        self.esma_si_df['ISIN'], valid = normalize_isins(self.esma_si_df['ISIN'])
+        if not valid.all():
+            logging.warning(f"{int((~valid).sum())} rows in esma_si_df have an invalid ISIN.")
+
+        logging.info("Normalized ISIN codes.")
+
     def _add_period_to_esma_si(self):
         """
         Adds the 'Period' column to the esma_si_df DataFrame based on calculation dates.
@@ -269,10 +312,6 @@ class DataProcessor:
         # Filter trade_source for 'SSR MM Review in scope' == 'Yes'
         trade_source_filtered = self.trade_source[self.trade_source['SSR MM Review in scope'] == 'Yes']
 
-        # Clean ISINs
-        trade_source_filtered['ISIN'] = trade_source_filtered['ISIN'].astype(str).str.strip().str.upper()
-        self.esma_si_df['ISIN'] = self.esma_si_df['ISIN'].astype(str).str.strip().str.upper()
-
         # Group by 'ISIN' and 'Period' to count CA-CIB trades
         cacib_trades = trade_source_filtered.groupby(['ISIN', 'Period']).size().reset_index(name='CA-CIB nb of trades')
 
@@ -2,8 +2,8 @@
 Report Generator Module for the Data Processing Application.
 
 This module defines the `ReportGenerator` class, which is responsible for saving
-processed data to Excel files and generating a textual report summarizing the
-results of the data processing. The report includes statistics and key information
+processed data to Excel files and to a local SQLite database, and generating a
+textual report summarizing the results of the data processing. The report includes statistics and key information
 that can be used for further analysis or auditing.
 
 Classes:
@@ -15,8 +15,10 @@ Date: 2024-09-23
 
 
 import os
+import sqlite3
 import pandas as pd
 import logging
+from config.settings import DATABASE_FILENAME, DATABASE_TABLES, DATABASE_INDEX_COLUMNS
 
 
 class ReportGenerator:
@@ -66,6 +68,50 @@ class ReportGenerator:
         logging.info("Saved processed data to Excel files.")
 
 
+    def save_to_database(self, trade_source, trade_source_scope, result_df, issuer_review):
+        """
+        Bulk-loads the processed data into a SQLite database in the output directory.
+
+        Each DataFrame is written to its own table in a single transaction, replacing
+        any previous run, and indexes are created on the ISIN, ISSUER and Period
+        columns present in each table so downstream reporting can query them directly.
+
+        Args:
+            trade_source (pd.DataFrame): Processed Trade_Source DataFrame.
+            trade_source_scope (pd.DataFrame): Processed Trade_Source_Scope DataFrame.
+            result_df (pd.DataFrame): DataFrame resulting from F&S review by ISIN.
+            issuer_review (pd.DataFrame): DataFrame resulting from F&S review by Issuer.
+
+        Returns:
+            str: Path to the database file.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        database_output = os.path.join(self.output_dir, DATABASE_FILENAME)
+
+        frames = {
+            'trade_source': trade_source,
+            'trade_source_scope': trade_source_scope,
+            'result_df': result_df,
+            'issuer_review': issuer_review
+        }
+
+        connection = sqlite3.connect(database_output)
+        try:
+            with connection:
+                for key, df in frames.items():
+                    table = DATABASE_TABLES[key]
+                    df.to_sql(table, connection, if_exists='replace', index=False, chunksize=50000)
+                    for col in DATABASE_INDEX_COLUMNS:
+                        if col in df.columns:
+                            connection.execute(
+                                f'CREATE INDEX IF NOT EXISTS "idx_{table}_{col}" ON "{table}" ("{col}")')
+        finally:
+            connection.close()
+
+        logging.info(f"Saved processed data to database {database_output}.")
+        return database_output
+
+
     def generate_report(self, esma_si_df, trade_source, trade_source_scope, result_df, issuer_review, all_periods):
         """
         Generates a textual report summarizing the data processing results, including data analysis.
@@ -220,6 +266,7 @@ class ReportGenerator:
         report += f"Processed Trade Source Scope: {os.path.join(self.output_dir, 'processed_trade_source_scope.xlsx')}\n"
         report += f"F&S Review by ISIN: {os.path.join(self.output_dir, 'F_S_review_by_ISIN.xlsx')}\n"
         report += f"F&S Review by Issuer: {os.path.join(self.output_dir, 'F_S_review_by_Issuer.xlsx')}\n"
+        report += f"Processed Data Database: {os.path.join(self.output_dir, DATABASE_FILENAME)}\n"
 
         logging.info("Generated report with data analysis and corresponding periods.")
         return report
@@ -0,0 +1,220 @@
+"""
+Schema Validator Module for the Data Processing Application.
+
+This module defines the `SchemaValidator` class, which checks the structure of the
+input workbooks before the full load. Only the header and a sample of rows are read
+from each Excel file, so column, dtype, date and ISIN problems are reported within
+a second instead of surfacing as `KeyError`s deep in the processing run.
+
+Classes:
+    SchemaValidationError: Raised when one or more inputs fail validation.
+    SchemaValidator: Runs vectorized schema checks on sampled input data.
+
+Author: Ben Pfeffer
+Date: 2024-09-23
+"""
+
+
+import logging
+import pandas as pd
+from config.settings import (
+    SCHEMA_SAMPLE_ROWS,
+    MIN_DATE_PARSE_RATE,
+    MIN_ISIN_VALID_RATE,
+    TRADE_REQUIRED_COLUMNS,
+    ESMA_SI_REQUIRED_COLUMNS
+)
+from utils.helpers import ISIN_PATTERN
+
+
+class SchemaValidationError(ValueError):
+    """
+    Raised when input data does not match the expected schema.
+
+    Attributes:
+        issues (list): One message per failed check, prefixed with the source name.
+    """
+
+    def __init__(self, issues):
+        self.issues = issues
+        report = "Input schema validation failed:\n" + "\n".join(f"- {issue}" for issue in issues)
+        super().__init__(report)
+
+
+class SchemaValidator:
+    """
+    A class to validate the schema of the input data on a sample of rows.
+
+    Attributes:
+        esma_si_df (pd.DataFrame): DataFrame containing ESMA_SI data.
+        trade_source_file (str): Path to the Trade_Source Excel file.
+        trade_source_scope_file (str): Path to the Trade_Source_Scope Excel file.
+        esma_threshold_file (str): Path to the ESMA_Threshold Excel file.
+        sample_rows (int): Number of rows read from each workbook.
+        issues (list): Messages collected by the last call to `validate`.
+    """
+
+    def __init__(self, esma_si_df, trade_source_file, trade_source_scope_file, esma_threshold_file,
+                 sample_rows=SCHEMA_SAMPLE_ROWS):
+        """
+        Initializes the SchemaValidator with the inputs to check.
+
+        Args:
+            esma_si_df (pd.DataFrame): DataFrame containing ESMA_SI data.
+            trade_source_file (str): Path to the Trade_Source Excel file.
+            trade_source_scope_file (str): Path to the Trade_Source_Scope Excel file.
+            esma_threshold_file (str): Path to the ESMA_Threshold Excel file.
+            sample_rows (int): Number of rows read from each workbook.
+        """
+        self.esma_si_df = esma_si_df
+        self.trade_source_file = trade_source_file
+        self.trade_source_scope_file = trade_source_scope_file
+        self.esma_threshold_file = esma_threshold_file
+        self.sample_rows = sample_rows
+        self.issues = []
+
+    def validate(self):
+        """
+        Runs all schema checks and raises a single error listing every problem found.
+
+        Raises:
+            SchemaValidationError: If any input fails validation.
+        """
+        self.issues = []
+
+        for name, file_path in [('Trade_Source', self.trade_source_file),
+                                ('Trade_Source_Scope', self.trade_source_scope_file)]:
+            sample = self._read_sample(name, file_path)
+            if sample is not None:
+                self._check_trade_sample(name, sample)
+
+        # ESMA_Threshold is only read for its header row
+        self._read_sample('ESMA_Threshold', self.esma_threshold_file, header=4, nrows=0)
+
+        if self.esma_si_df is not None:
+            self._check_esma_si_sample(self.esma_si_df.head(self.sample_rows))
+
+        if self.issues:
+            raise SchemaValidationError(self.issues)
+
+        logging.info("Input schema validated on sampled rows.")
+
+    def _read_sample(self, name, file_path, header=0, nrows=None):
+        """
+        Reads the header and a sample of rows from an Excel file.
+
+        Args:
+            name (str): Name of the source, used in messages.
+            file_path (str): Path to the Excel file.
+            header (int): Row number holding the column names.
+            nrows (int): Number of rows to read, defaults to `sample_rows`.
+
+        Returns:
+            pd.DataFrame or None: The sampled rows, or None if the file cannot be read.
+        """
+        try:
+            return pd.read_excel(file_path, header=header,
+                                 nrows=self.sample_rows if nrows is None else nrows)
+        except Exception as e:
+            self.issues.append(f"{name}: could not read workbook {file_path}: {e}")
+            return None
+
+    def _check_required_columns(self, name, df, required_columns):
+        """
+        Records the required columns missing from a DataFrame.
+
+        Returns:
+            bool: True if all required columns are present.
+        """
+        missing = [col for col in required_columns if col not in df.columns]
+        if missing:
+            self.issues.append(
+                f"{name}: missing required columns: {', '.join(missing)} "
+                f"(found: {', '.join(map(str, df.columns))})")
+        return not missing
+
+    def _check_trade_sample(self, name, sample):
+        """
+        Checks columns, dtypes, dates and ISINs of a Trade_Source-like sample.
+        """
+        if not self._check_required_columns(name, sample, TRADE_REQUIRED_COLUMNS):
+            return
+        if sample.empty:
+            self.issues.append(f"{name}: workbook contains no data rows.")
+            return
+
+        self._check_numeric(name, sample, 'M_SPLIT_INI')
+        self._check_date_parse_rate(name, sample['M_TRN_DATE'], 'M_TRN_DATE', date_format='%d/%m/%Y')
+        self._check_isin_format(name, sample['ISIN'])
+
+    def _check_esma_si_sample(self, sample):
+        """
+        Checks columns, dtypes, dates and ISINs of the ESMA_SI DataFrame sample.
+        """
+        name = 'ESMA_SI'
+        if not self._check_required_columns(name, sample, ESMA_SI_REQUIRED_COLUMNS):
+            return
+        if sample.empty:
+            self.issues.append(f"{name}: DataFrame contains no rows.")
+            return
+
+        self._check_numeric(name, sample, 'Total number of transactions executed in the EU')
+        self._check_date_parse_rate(name, sample['Calculation From Date'], 'Calculation From Date')
+        self._check_isin_format(name, sample['ISIN'])
+
+    def _check_numeric(self, name, sample, column):
+        """
+        Records non-numeric values in a column that must be numeric.
+        """
+        values = sample[column]
+        numeric = pd.to_numeric(values, errors='coerce')
+        bad = numeric.isna() & values.notna()
+        if bad.any():
+            examples = ', '.join(repr(v) for v in values[bad].unique()[:3])
+            self.issues.append(
+                f"{name}: column '{column}' has {bad.sum()} non-numeric values "
+                f"out of {len(values)} sampled (dtype {values.dtype}; e.g. {examples})")
+
+    def _check_date_parse_rate(self, name, values, column, date_format=None):
+        """
+        Records a date column whose parse rate is below `MIN_DATE_PARSE_RATE`.
+
+        Args:
+            name (str): Name of the source, used in messages.
+            values (pd.Series): Sampled date values.
+            column (str): Name of the column, used in messages.
+            date_format (str): Expected format for string dates, inferred if None.
+        """
+        values = values.dropna()
+        if values.empty:
+            self.issues.append(f"{name}: column '{column}' has no values in the sample.")
+            return
+
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return
+        # Cells already stored as dates by Excel pass through unchanged
+        parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+
+        parse_rate = parsed.notna().mean()
+        if parse_rate < MIN_DATE_PARSE_RATE:
+            examples = ', '.join(repr(v) for v in values[parsed.isna()].unique()[:3])
+            self.issues.append(
+                f"{name}: column '{column}' parsed {parse_rate:.1%} of {len(values)} sampled dates "
+                f"(minimum {MIN_DATE_PARSE_RATE:.0%}; e.g. {examples})")
+
+    def _check_isin_format(self, name, values):
+        """
+        Records an ISIN column whose share of well-formed codes is below `MIN_ISIN_VALID_RATE`.
+        """
+        isins = values.dropna().astype(str).str.strip().str.upper()
+        if isins.empty:
+            self.issues.append(f"{name}: column 'ISIN' has no values in the sample.")
+            return
+
+        valid = isins.str.match(ISIN_PATTERN)
+        valid_rate = valid.mean()
+        if valid_rate < MIN_ISIN_VALID_RATE:
+            examples = ', '.join(repr(v) for v in isins[~valid].unique()[:3])
+            self.issues.append(
+                f"{name}: column 'ISIN' has {valid_rate:.1%} well-formed codes in {len(isins)} sampled values "
+                f"(minimum {MIN_ISIN_VALID_RATE:.0%}; e.g. {examples})")
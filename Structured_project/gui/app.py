@@ -320,6 +320,12 @@ class DataProcessingApp(ctk.CTk):
                 data_processor.result_df,
                 data_processor.issuer_review
             )
+            report_generator.save_to_database(
+                self.processed_trade_source,
+                self.processed_trade_source_scope,
+                data_processor.result_df,
+                data_processor.issuer_review
+            )
 
             report = report_generator.generate_report(
                 esma_si_df=self.esma_si_df,
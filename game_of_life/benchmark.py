@@ -0,0 +1,79 @@
+"""
+    Benchmark suite for the game of life engines.
+
+    Runs seeded random soups of several board sizes and densities through every
+    engine, prints the throughput, peak memory and final population of each run,
+    and checks that the engines agree on the final cells:
+
+        python benchmark.py
+        python benchmark.py --sizes 64 256 1024 --densities 0.01 0.3 --generations 200
+
+    The dense, sparse and parallel engines are compared on the torus. Hashlife runs on the
+    unbounded plane, so it is compared with the sparse engine in unbounded mode.
+"""
+import argparse
+
+import numpy as np
+
+from headless import ENGINES, close_engine, format_result, run
+from life_engine import SparseLifeEngine
+from template_grid import Dim, Grid
+
+DEFAULT_SIZES = (64, 256, 512)
+DEFAULT_DENSITIES = (0.01, 0.05, 0.2)
+DEFAULT_GENERATIONS = 100
+
+
+def random_soup(dim: Dim, density: float, seed: int = 0) -> Grid:
+    """ Returns a Grid where each cell is alive with the given probability. """
+    alive = np.random.default_rng(seed).random((dim.width, dim.height)) < density
+    xs, ys = np.nonzero(alive)
+    return Grid(dim, set(zip(xs.tolist(), ys.tolist())))
+
+
+def reference_cells(grid: Grid, generations: int, wrap: bool) -> set:
+    """ Final cells from the sparse engine, used to check the other engines. """
+    engine = SparseLifeEngine.from_grid(grid, wrap=wrap)
+    engine.step(generations)
+    return engine.to_cells()
+
+
+def run_suite(sizes=DEFAULT_SIZES, densities=DEFAULT_DENSITIES, generations: int = DEFAULT_GENERATIONS,
+              engines=ENGINES, measure_memory: bool = True, seed: int = 0) -> list:
+    """ Runs every engine on every board and returns (size, density, RunResult, agrees) rows. """
+    rows = []
+    for size in sizes:
+        for density in densities:
+            grid = random_soup(Dim(size, size), density, seed)
+            torus = reference_cells(grid, generations, wrap=True)
+            plane = reference_cells(grid, generations, wrap=False) if "hashlife" in engines else None
+            print(f"--- {size}x{size} board, density {density:g}, {len(grid.cells)} live cells")
+            for engine in engines:
+                result, life = run(grid, generations, engine, measure_memory)
+                agrees = life.to_cells() == (plane if engine == "hashlife" else torus)
+                close_engine(life)
+                print(f"{format_result(result)}{'' if agrees else '  MISMATCH'}")
+                rows.append((size, density, result, agrees))
+    return rows
+
+
+def main(argv=None):
+    """ Command line entry point. """
+    parser = argparse.ArgumentParser(description="Compare the game of life engines.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--densities", type=float, nargs="+", default=DEFAULT_DENSITIES)
+    parser.add_argument("-n", "--generations", type=int, default=DEFAULT_GENERATIONS)
+    parser.add_argument("-e", "--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced runs for peak memory")
+    args = parser.parse_args(argv)
+
+    rows = run_suite(args.sizes, args.densities, args.generations, args.engines, not args.no_memory, args.seed)
+    mismatches = [row for row in rows if not row[3]]
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} run(s) disagree with the reference engine.")
+    print("All engines agree.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+    Cycle detection for the game of life.
+
+    Every generation is reduced to a 64-bit Zobrist hash: the XOR of one random key
+    per live cell. Between two generations only the cells that changed flip their
+    key in or out, so the hash is updated from the changed cells alone. Recent
+    hashes are kept in a bounded table; when a hash comes back the board has
+    entered a still life (period 1) or an oscillator, and long runs can jump over
+    whole periods instead of computing them.
+
+    Dense engines use a per-cell key table. Sparse engines, whose boards can be far
+    too large for a table, hash their packed cell keys with a mixing function.
+"""
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+Cycle = namedtuple("Cycle", ["start", "period"])
+
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def mix64(keys: np.ndarray) -> np.ndarray:
+    """ SplitMix64 finalizer: spreads uint64 keys into well-mixed 64-bit hashes. """
+    z = keys.astype(np.uint64, copy=True)
+    z ^= z >> np.uint64(30)
+    z *= _MIX_1
+    z ^= z >> np.uint64(27)
+    z *= _MIX_2
+    z ^= z >> np.uint64(31)
+    return z
+
+
+class CycleDetector:
+    """ Hashes successive generations and reports when the board repeats. """
+
+    def __init__(self, max_history: int = 1024, seed: int = 0):
+        """ Initialize an empty history holding at most max_history generations.
+
+        Only cycles with a period up to max_history can be detected.
+        """
+        self.max_history = max_history
+        self.seed = seed
+        self.cycle = None
+        self.hash = np.uint64(0)
+        self._history = OrderedDict()
+        self._keys = None
+        self._previous = None
+
+    def reset(self) -> None:
+        """ Forgets the history, e.g. after the board was edited. """
+        self.cycle = None
+        self.hash = np.uint64(0)
+        self._history.clear()
+        self._previous = None
+
+    def _zobrist_keys(self, shape: tuple) -> np.ndarray:
+        """ Returns one random uint64 key per cell, built once per board size. """
+        if self._keys is None or self._keys.shape != shape:
+            rng = np.random.default_rng(self.seed)
+            self._keys = rng.integers(0, 2**64, size=shape, dtype=np.uint64, endpoint=False)
+            self._previous = None
+        return self._keys
+
+    def hash_engine(self, engine) -> np.uint64:
+        """ Returns the hash of the engine's current generation. """
+        if hasattr(engine, "board"):
+            keys = self._zobrist_keys(engine.board.shape)
+            if self._previous is None:
+                self._previous = engine.board.astype(bool)
+                self.hash = np.bitwise_xor.reduce(keys[self._previous], initial=np.uint64(0))
+            else:
+                # Flip the keys of the cells that were born or died since the last call
+                changed = np.not_equal(engine.board.view(bool), self._previous)
+                self.hash ^= np.bitwise_xor.reduce(keys[changed], initial=np.uint64(0))
+                self._previous[changed] ^= True
+        else:
+            self.hash = np.bitwise_xor.reduce(mix64(engine.keys ^ np.uint64(self.seed)), initial=np.uint64(0))
+        return self.hash
+
+    def update(self, engine) -> Cycle:
+        """ Records the engine's current generation and returns the Cycle once it repeats. """
+        if self.cycle is not None:
+            return self.cycle
+        value = int(self.hash_engine(engine))
+        start = self._history.get(value)
+        if start == engine.generation:
+            return None
+        if start is not None:
+            self.cycle = Cycle(start, engine.generation - start)
+            return self.cycle
+        self._history[value] = engine.generation
+        if len(self._history) > self.max_history:
+            self._history.popitem(last=False)
+        return None
+
+    def advance(self, engine, generations: int, skip: bool = True) -> Cycle:
+        """ Steps the engine by the given number of generations and returns the Cycle found, if any.
+
+        With skip, once the board repeats only the remainder modulo the period is
+        computed and whole periods are added to the generation count. Cells alive
+        for a full period stay alive forever, so their ages advance by the skipped
+        generations (up to the engine's max_age); every other age repeats with the
+        period and is left as is.
+        """
+        target = engine.generation + generations
+        if self.cycle is None:
+            self.update(engine)
+        while engine.generation < target:
+            if self.cycle is not None and skip:
+                period = self.cycle.period
+                skipped = (target - engine.generation) // period * period
+                if skipped:
+                    if getattr(engine, "track_age", True):
+                        long_lived = engine.age >= min(period, engine.max_age)
+                        engine.age[long_lived] = np.minimum(
+                            engine.age[long_lived].astype(np.int64) + skipped, engine.max_age)
+                    engine.generation += skipped
+                engine.step(target - engine.generation)
+                break
+            engine.step()
+            self.update(engine)
+        return self.cycle
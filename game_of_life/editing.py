@@ -0,0 +1,83 @@
+"""
+    Bulk editing of dense game of life boards.
+
+    Each primitive changes a (width, height) uint8 board in one array operation:
+    a seeded random fill, rectangular and circular brush stamps, and pattern
+    stamping. They work on any dense board (LifeEngine.board, the parallel
+    engine's shared board, or a plain array), with or without a display. Stamps
+    wrap around the edges on a torus and are clipped on a bounded board; when an
+    age array is given, the ages of the stamped cells restart from 0.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+
+def random_fill(board: np.ndarray, density: float, seed=None) -> np.ndarray:
+    """ Fills the board with live cells at the given density and returns it.
+
+    seed may be an int, None for fresh entropy, or a numpy Generator.
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    np.less(rng.random(board.shape, dtype=np.float32), density, out=board.view(bool))
+    return board
+
+
+def _stamp(board: np.ndarray, xs: np.ndarray, ys: np.ndarray, value, wrap: bool, age: np.ndarray = None) -> None:
+    """ Writes value at the given cell coordinates, wrapped or clipped to the board. """
+    width, height = board.shape
+    if wrap:
+        xs, ys = xs % width, ys % height
+    else:
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        xs, ys = xs[inside], ys[inside]
+    board[xs, ys] = value
+    if age is not None:
+        age[xs, ys] = 0
+
+
+def stamp_rect(board: np.ndarray, x: int, y: int, width: int, height: int, value=1,
+               wrap: bool = True, age: np.ndarray = None) -> None:
+    """ Sets every cell of the width x height rectangle with top-left corner (x, y) to value. """
+    xs = np.arange(x, x + width)
+    ys = np.arange(y, y + height)
+    board_width, board_height = board.shape
+    if wrap:
+        index = np.ix_(xs % board_width, ys % board_height)
+    else:
+        index = np.ix_(xs[(xs >= 0) & (xs < board_width)], ys[(ys >= 0) & (ys < board_height)])
+    board[index] = value
+    if age is not None:
+        age[index] = 0
+
+
+def stamp_brush(board: np.ndarray, x: int, y: int, size: int, value=1, shape: str = "square",
+                wrap: bool = True, age: np.ndarray = None) -> None:
+    """ Paints a brush of the given size centred on (x, y).
+
+    A square brush of size n covers (2n - 1) x (2n - 1) cells; a circular brush
+    covers the cells within n - 1 cells of the centre.
+    """
+    if shape == "circle":
+        offsets = circle_offsets(size - 1)
+        _stamp(board, x + offsets[:, 0], y + offsets[:, 1], value, wrap, age)
+    else:
+        stamp_rect(board, x - size + 1, y - size + 1, 2 * size - 1, 2 * size - 1, value, wrap, age)
+
+
+@lru_cache(maxsize=32)
+def circle_offsets(radius: int) -> np.ndarray:
+    """ Returns the (dx, dy) offsets within radius of the centre, computed once per radius. """
+    span = np.arange(-radius, radius + 1)
+    dx, dy = np.meshgrid(span, span, indexing="ij")
+    inside = dx * dx + dy * dy <= radius * radius + radius  # The + radius rounds the outline like a disc
+    offsets = np.stack([dx[inside], dy[inside]], axis=1)
+    offsets.flags.writeable = False
+    return offsets
+
+
+def stamp_pattern(board: np.ndarray, cells: np.ndarray, x: int, y: int, wrap: bool = True,
+                  age: np.ndarray = None) -> None:
+    """ Sets the live cells of a pattern, given as (n, 2) offsets, with its origin at (x, y). """
+    cells = np.asarray(cells).reshape(-1, 2)
+    _stamp(board, x + cells[:, 0].astype(np.intp), y + cells[:, 1].astype(np.intp), 1, wrap, age)
@@ -1,13 +1,26 @@
+import os
 import sys
 import time
-from collections import defaultdict
 from copy import deepcopy
+import numpy as np
 import pygame
-import random
-import colorsys
 
-from game_system import GOSPER_GLIDER
-from template_grid import Grid, Neighbours
+from editing import random_fill, stamp_brush, stamp_pattern
+from game_system import GOSPER_GLIDER, PATTERNS
+from hashlife import HashLifeEngine
+from history import History
+from instrumentation import HudOverlay
+from life_engine import LifeEngine, SparseLifeEngine, SPARSE_DENSITY_THRESHOLD, board_to_cells, grid_to_board
+from pattern_library import PatternLibrary
+from rules import LIFE, RULES
+from renderer import GridRenderer
+from simulation import SimulationWorker
+from template_grid import Dim, Grid, Neighbours
+
+RENDER_FPS = 60
+SESSION_FILE = "life_session.npz"
+METRICS_FILE = "life_metrics.csv"
+MAX_SPEED = 100000  # generations per second
 
 class GameSystem:
     """ This class represents the game system. """
@@ -16,7 +29,7 @@ class GameSystem:
         """ Initialize attributes of the gamesystem. """
         self.master = master
         self.paused = False
-        self.speed = 10  # frames per second
+        self.speed = 10  # generations per second
         self.color_scheme = {
             'background': (0, 0, 0),
             'cell': (255, 0, 0),
@@ -24,18 +37,20 @@ class GameSystem:
             'highlight': (0, 255, 0)
         }
         self.brush_size = 1
+        self.brush_shape = "square"  # square or circle
         self.highlight_cells = set()
         self.generation = 0
         self.mode = "classic"  # classic, heatmap, or trails
-        self.cell_age = defaultdict(int)
+        self.engine = "auto"  # dense, sparse, or auto
+        self.rule = LIFE  # any Life-like rule from rules.py
+        self.wrap = True  # False gives a bounded board with dead cells beyond the edges
+        # Saturating cell ages, None until the first update: a (width, height) array after a dense step,
+        # a dict keyed by (x, y) after a sparse one so that huge sparse worlds never get a dense array
+        self.cell_age = None
         self.trail_length = 5
-        self.patterns = {
-            'glider': [(0, 0), (1, 1), (2, 1), (0, 2), (1, 2)],
-            'blinker': [(0, 0), (1, 0), (2, 0)],
-            'pulsar': [(2,0),(3,0),(4,0),(8,0),(9,0),(10,0),(0,2),(5,2),(7,2),(12,2),(0,3),(5,3),(7,3),(12,3),(0,4),(5,4),(7,4),(12,4),(2,5),(3,5),(4,5),(8,5),(9,5),(10,5),(2,7),(3,7),(4,7),(8,7),(9,7),(10,7),(0,8),(5,8),(7,8),(12,8),(0,9),(5,9),(7,9),(12,9),(0,10),(5,10),(7,10),(12,10),(2,12),(3,12),(4,12),(8,12),(9,12),(10,12)],
-            'spaceship': [(1,0),(4,0),(0,1),(0,2),(4,2),(0,3),(1,3),(2,3),(3,3)],
-            'pentadecathlon': [(0,0),(0,1),(0,2),(0,3),(0,4),(0,5),(0,6),(0,7),(0,8),(0,9)]
-        }
+        self.renderer = GridRenderer(self.color_scheme, self.trail_length)
+        self.patterns = dict(PATTERNS)
+        self.library = PatternLibrary()  # .rle and .lif files in the patterns directory
     
     @staticmethod
     def get_neighbours(grid: Grid, x: int, y: int) -> Neighbours:
@@ -47,77 +62,96 @@ class GameSystem:
     
     def update_grid(self, grid: Grid) -> Grid:
         """ Returns the next iteration of the game of life. """
-        new_cells = set()
-        undead = defaultdict(int)
-        new_cell_age = defaultdict(int)
-        
-        for x in range(grid.dim.width):
-            for y in range(grid.dim.height):
-                alive_neighbours, dead_neighbours = self.get_neighbours(grid, x, y)
-                if (x, y) in grid.cells:
-                    if len(alive_neighbours) in [2, 3]:
-                        new_cells.add((x, y))
-                        new_cell_age[(x, y)] = self.cell_age[(x, y)] + 1
-                else:
-                    undead[(x, y)] = len(alive_neighbours)
-        
-        for pos, count in undead.items():
-            if count == 3:
-                new_cells.add(pos)
-                new_cell_age[pos] = 0
-        
-        self.cell_age = new_cell_age
-        return Grid(grid.dim, new_cells)
+        area = grid.dim.width * grid.dim.height
+        sparse_ok = self.rule == LIFE and self.wrap  # The sparse engine only runs Life on the torus
+        if sparse_ok and (self.engine == "sparse" or
+                          (self.engine == "auto" and len(grid.cells) < SPARSE_DENSITY_THRESHOLD * area)):
+            engine = SparseLifeEngine.from_grid(grid, self._ages_for(grid))
+            engine.step()
+            self.cell_age = engine.age_dict()
+        else:
+            engine = LifeEngine.from_grid(grid, self._ages_for(grid), self.rule, self.wrap)
+            engine.step()
+            self.cell_age = engine.age
+        return engine.to_grid()
+
+    def _ages_for(self, grid: Grid):
+        """ Returns cell_age if it is a dict or an array matching the grid's size, otherwise None (all ages 0). """
+        if isinstance(self.cell_age, dict):
+            return self.cell_age
+        if self.cell_age is not None and self.cell_age.shape == (grid.dim.width, grid.dim.height):
+            return self.cell_age
+        return None
     
-    def draw_grid(self, screen: pygame.Surface, grid: Grid) -> None:
-        """ Draws the game of life on the pygame.Surface object. """
-        cell_width = screen.get_width() / grid.dim.width
-        cell_height = screen.get_height() / grid.dim.height
-        
-        # Draw grid lines
-        for x in range(grid.dim.width + 1):
-            pygame.draw.line(screen, self.color_scheme['grid'], (x * cell_width, 0), (x * cell_width, screen.get_height()))
-        for y in range(grid.dim.height + 1):
-            pygame.draw.line(screen, self.color_scheme['grid'], (0, y * cell_height), (screen.get_width(), y * cell_height))
-        
-        # Draw cells
-        for x, y in grid.cells:
-            if self.mode == "classic":
-                color = self.color_scheme['highlight'] if (x, y) in self.highlight_cells else self.color_scheme['cell']
-            elif self.mode == "heatmap":
-                hue = min(self.cell_age[(x, y)] / 100, 1)  # Max age of 100 generations
-                color = [int(c * 255) for c in colorsys.hsv_to_rgb(hue, 1, 1)]
-            elif self.mode == "trails":
-                age = min(self.cell_age[(x, y)], self.trail_length)
-                color = [int(c * (self.trail_length - age) / self.trail_length) for c in self.color_scheme['cell']]
-            
-            pygame.draw.rect(
-                screen,
-                color,
-                (x * cell_width + 1, y * cell_height + 1, cell_width - 1, cell_height - 1)
-            )
+    def fast_forward(self, grid: Grid, generations: int) -> Grid:
+        """ Jumps many generations at once on the board's own edges; cell ages restart from 0.
+
+        Hashlife runs on the unbounded plane, so it is only used for Life patterns that
+        cannot reach an edge within the jump, where the plane and the board agree.
+        Everything else is stepped with the dense engine, which wraps or stops at the
+        edges like normal stepping.
+        """
+        self.cell_age = None
+        if self.rule == LIFE and grid.cells and self._clear_of_edges(grid, generations):
+            engine = HashLifeEngine.from_grid(grid)
+            engine.step(generations)
+            return engine.to_grid(grid.dim)
+        engine = LifeEngine(grid.dim.width, grid.dim.height, track_age=False, rule=self.rule, wrap=self.wrap)
+        engine.set_grid(grid)
+        engine.step(generations)
+        return engine.to_grid()
+
+    @staticmethod
+    def _clear_of_edges(grid: Grid, generations: int) -> bool:
+        """ Returns whether the live cells stay off the edge rows and columns for the given generations.
+
+        A pattern grows by at most one cell per generation, so this only needs the bounding box.
+        """
+        xs, ys = zip(*grid.cells)
+        return (min(xs) - generations >= 1 and max(xs) + generations <= grid.dim.width - 2 and
+                min(ys) - generations >= 1 and max(ys) + generations <= grid.dim.height - 2)
+
+    def draw_grid(self, screen: pygame.Surface, grid: Grid) -> list:
+        """ Draws the game of life on the pygame.Surface object and returns the changed rectangles. """
+        engine = LifeEngine.from_grid(grid, self._ages_for(grid))
+        return self.draw_frame(screen, engine.board, engine.age)
+
+    def draw_frame(self, screen: pygame.Surface, board: np.ndarray, age: np.ndarray,
+                   highlight: np.ndarray = None) -> list:
+        """ Draws a dense board and its cell ages, returning the changed rectangles.
+
+        highlight is a boolean board of cells to highlight; without it highlight_cells is used.
+        """
+        if highlight is None and self.highlight_cells:
+            highlight = grid_to_board(Grid(Dim(*board.shape), self.highlight_cells)).view(bool)
+        return self.renderer.draw(screen, board, age, self.mode, highlight)
+
+    def pattern_cells(self, pattern: str) -> np.ndarray:
+        """ Returns the (n, 2) offsets of a predefined or library pattern, or None if it is unknown. """
+        if pattern in self.patterns:
+            return np.array(self.patterns[pattern], dtype=np.int32).reshape(-1, 2)
+        if pattern in self.library:
+            return self.library.load(pattern)
+        return None
 
     def add_pattern(self, grid: Grid, pattern: str, x: int, y: int) -> Grid:
-        """ Adds a predefined pattern to the grid at the specified position. """
-        new_cells = grid.cells.copy()
-        for dx, dy in self.patterns.get(pattern, []):
-            new_x = (x + dx) % grid.dim.width
-            new_y = (y + dy) % grid.dim.height
-            new_cells.add((new_x, new_y))
-        return Grid(grid.dim, new_cells)
+        """ Adds a predefined pattern or a pattern from the library to the grid at the specified position. """
+        offsets = self.pattern_cells(pattern)
+        if offsets is None:
+            return grid
+        xs = ((x + offsets[:, 0]) % grid.dim.width).tolist()
+        ys = ((y + offsets[:, 1]) % grid.dim.height).tolist()
+        return Grid(grid.dim, grid.cells | set(zip(xs, ys)))
 
-    def randomize_grid(self, grid: Grid, density: float) -> Grid:
-        """ Randomizes the grid with the given density of live cells. """
-        new_cells = set()
-        for x in range(grid.dim.width):
-            for y in range(grid.dim.height):
-                if random.random() < density:
-                    new_cells.add((x, y))
-        return Grid(grid.dim, new_cells)
+    def randomize_grid(self, grid: Grid, density: float, seed=None) -> Grid:
+        """ Randomizes the grid with the given density of live cells, reproducibly if a seed is given. """
+        board = random_fill(np.empty((grid.dim.width, grid.dim.height), dtype=np.uint8), density, seed)
+        return Grid(grid.dim, board_to_cells(board))
 
 def main():
     """ Main entry point. """
     grid = GOSPER_GLIDER
+    dim = grid.dim
     
     pygame.init()
     screen = pygame.display.set_mode((800, 600))
@@ -126,60 +160,95 @@ def main():
     game_system = GameSystem(None)
     clock = pygame.time.Clock()
     
-    font = pygame.font.Font(None, 24)
+    # The simulation steps on its own thread; this loop only handles input and drawing
+    worker = SimulationWorker(grid, game_system.speed, game_system.rule, game_system.wrap)
+    rules = list(RULES.values())
+    worker.start()
+    
+    hud = HudOverlay(pygame.font.Font(None, 24))
+    highlight_mask = np.zeros(tuple(dim), dtype=np.uint8)
+    previous_hud_rect = pygame.Rect(0, 0, 0, 0)
+    
+    def cell_under_mouse():
+        x, y = pygame.mouse.get_pos()
+        return x // (screen.get_width() // dim.width), y // (screen.get_height() // dim.height)
+    
+    def load_grid(new_grid):
+        worker.edit(lambda engine: engine.set_grid(new_grid(engine)))
+    
+    pattern_keys = {
+        pygame.K_l: 'glider',
+        pygame.K_b: 'blinker',
+        pygame.K_p: 'pulsar',
+        pygame.K_s: 'spaceship',
+        pygame.K_d: 'pentadecathlon',
+        pygame.K_a: 'acorn',
+        pygame.K_u: 'gosper_glider_gun',
+    }
     
     while True:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                worker.stop()
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     game_system.paused = not game_system.paused
+                    worker.paused = game_system.paused
                 elif event.key == pygame.K_UP:
-                    game_system.speed = min(60, game_system.speed + 5)
+                    game_system.speed = min(MAX_SPEED, game_system.speed * 2)
+                    worker.speed = game_system.speed
                 elif event.key == pygame.K_DOWN:
-                    game_system.speed = max(1, game_system.speed - 5)
+                    game_system.speed = max(1, game_system.speed // 2)
+                    worker.speed = game_system.speed
                 elif event.key == pygame.K_r:
-                    grid = Grid(grid.dim, set())  # Reset to empty grid
-                    game_system.cell_age.clear()
+                    load_grid(lambda engine: Grid(dim, set()))  # Reset to empty grid
                 elif event.key == pygame.K_g:
-                    grid = GOSPER_GLIDER  # Reset to Gosper Glider
-                    game_system.cell_age.clear()
+                    load_grid(lambda engine: GOSPER_GLIDER)  # Reset to Gosper Glider
                 elif event.key == pygame.K_1:
                     game_system.brush_size = 1
                 elif event.key == pygame.K_2:
                     game_system.brush_size = 2
                 elif event.key == pygame.K_3:
                     game_system.brush_size = 3
-                elif event.key == pygame.K_l:
-                    x, y = pygame.mouse.get_pos()
-                    cell_x = x // (screen.get_width() // grid.dim.width)
-                    cell_y = y // (screen.get_height() // grid.dim.height)
-                    grid = game_system.add_pattern(grid, 'glider', cell_x, cell_y)
-                elif event.key == pygame.K_b:
-                    x, y = pygame.mouse.get_pos()
-                    cell_x = x // (screen.get_width() // grid.dim.width)
-                    cell_y = y // (screen.get_height() // grid.dim.height)
-                    grid = game_system.add_pattern(grid, 'blinker', cell_x, cell_y)
-                elif event.key == pygame.K_p:
-                    x, y = pygame.mouse.get_pos()
-                    cell_x = x // (screen.get_width() // grid.dim.width)
-                    cell_y = y // (screen.get_height() // grid.dim.height)
-                    grid = game_system.add_pattern(grid, 'pulsar', cell_x, cell_y)
-                elif event.key == pygame.K_s:
-                    x, y = pygame.mouse.get_pos()
-                    cell_x = x // (screen.get_width() // grid.dim.width)
-                    cell_y = y // (screen.get_height() // grid.dim.height)
-                    grid = game_system.add_pattern(grid, 'spaceship', cell_x, cell_y)
-                elif event.key == pygame.K_d:
-                    x, y = pygame.mouse.get_pos()
-                    cell_x = x // (screen.get_width() // grid.dim.width)
-                    cell_y = y // (screen.get_height() // grid.dim.height)
-                    grid = game_system.add_pattern(grid, 'pentadecathlon', cell_x, cell_y)
+                elif event.key == pygame.K_q:
+                    game_system.brush_shape = "circle" if game_system.brush_shape == "square" else "square"
+                elif event.key in pattern_keys:
+                    cells = game_system.pattern_cells(pattern_keys[event.key])
+                    if cells is not None:
+                        cell_x, cell_y = cell_under_mouse()
+                        worker.edit(lambda engine, cells=cells, x=cell_x, y=cell_y:
+                                    stamp_pattern(engine.board, cells, x, y, engine.wrap, engine.age))
                 elif event.key == pygame.K_m:
-                    grid = game_system.randomize_grid(grid, 0.3)  # 30% density
-                    game_system.cell_age.clear()
+                    def randomize(engine):
+                        random_fill(engine.board, 0.3)  # 30% density
+                        engine.age[...] = 0
+                    worker.edit(randomize)
+                elif event.key == pygame.K_f:
+                    def fast_forward(engine, generations=1024):
+                        engine.set_grid(game_system.fast_forward(engine.to_grid(), generations))
+                        engine.generation += generations
+                    worker.edit(fast_forward)
+                elif event.key == pygame.K_k:
+                    game_system.rule = rules[(rules.index(game_system.rule) + 1) % len(rules)]
+                    worker.edit(lambda engine, rule=game_system.rule: setattr(engine, "rule", rule))
+                elif event.key == pygame.K_w:
+                    game_system.wrap = not game_system.wrap
+                    worker.edit(lambda engine, wrap=game_system.wrap: setattr(engine, "wrap", wrap))
+                elif event.key == pygame.K_LEFT:
+                    worker.rewind(10 if event.mod & pygame.KMOD_SHIFT else 1)
+                elif event.key == pygame.K_RIGHT:
+                    worker.rewind(-10 if event.mod & pygame.KMOD_SHIFT else -1)
+                elif event.key == pygame.K_e:
+                    worker.edit(lambda engine: worker.history.save(SESSION_FILE))
+                elif event.key == pygame.K_x:
+                    worker.edit(lambda engine: worker.metrics.export(METRICS_FILE))
+                elif event.key == pygame.K_o:
+                    if os.path.exists(SESSION_FILE):
+                        history = History.load(SESSION_FILE)
+                        if history.shape == tuple(dim) and len(history):
+                            worker.load_history(history)
                 elif event.key == pygame.K_c:
                     game_system.mode = "classic"
                 elif event.key == pygame.K_h:
@@ -187,55 +256,55 @@ def main():
                 elif event.key == pygame.K_t:
                     game_system.mode = "trails"
             elif event.type == pygame.MOUSEBUTTONDOWN or (event.type == pygame.MOUSEMOTION and event.buttons[0]):
-                x, y = pygame.mouse.get_pos()
-                cell_x = x // (screen.get_width() // grid.dim.width)
-                cell_y = y // (screen.get_height() // grid.dim.height)
-                for dx in range(-game_system.brush_size + 1, game_system.brush_size):
-                    for dy in range(-game_system.brush_size + 1, game_system.brush_size):
-                        new_x = (cell_x + dx) % grid.dim.width
-                        new_y = (cell_y + dy) % grid.dim.height
-                        if event.button == 1 or event.buttons[0]:  # Left click/drag
-                            grid.cells.add((new_x, new_y))
-                            game_system.cell_age[(new_x, new_y)] = 0
-                        elif event.button == 3:  # Right click
-                            grid.cells.discard((new_x, new_y))
-                            game_system.cell_age.pop((new_x, new_y), None)
-        
-        screen.fill(game_system.color_scheme['background'])
+                if event.type == pygame.MOUSEMOTION or event.button == 1:  # Left click/drag
+                    value = 1
+                elif event.button == 3:  # Right click
+                    value = 0
+                else:
+                    continue
+                cell_x, cell_y = cell_under_mouse()
+                worker.edit(lambda engine, x=cell_x, y=cell_y, value=value, size=game_system.brush_size,
+                            shape=game_system.brush_shape:
+                            stamp_brush(engine.board, x, y, size, value, shape, engine.wrap, engine.age))
         
-        # Update highlight cells
-        game_system.highlight_cells = set()
+        # Highlight the cells under the brush while paused
+        highlight = None
         if game_system.paused:
-            x, y = pygame.mouse.get_pos()
-            cell_x = x // (screen.get_width() // grid.dim.width)
-            cell_y = y // (screen.get_height() // grid.dim.height)
-            for dx in range(-game_system.brush_size + 1, game_system.brush_size):
-                for dy in range(-game_system.brush_size + 1, game_system.brush_size):
-                    new_x = (cell_x + dx) % grid.dim.width
-                    new_y = (cell_y + dy) % grid.dim.height
-                    game_system.highlight_cells.add((new_x, new_y))
-        
-        game_system.draw_grid(screen, grid)
+            highlight_mask.fill(0)
+            cell_x, cell_y = cell_under_mouse()
+            stamp_brush(highlight_mask, cell_x, cell_y, game_system.brush_size, 1, game_system.brush_shape,
+                        game_system.wrap)
+            highlight = highlight_mask.view(bool)
         
-        if not game_system.paused:
-            grid = game_system.update_grid(grid)
-            game_system.generation += 1
+        # Draw the latest generation the simulation published, skipping the ones in between
+        render_start = time.perf_counter()
+        with worker.frames.read() as frame:
+            dirty_rects = game_system.draw_frame(screen, frame.board, frame.age, highlight)
+            population = int(np.count_nonzero(frame.board))
+            generation = frame.generation
+        worker.metrics.record_render(time.perf_counter() - render_start)
+        latest = worker.metrics.latest
         
-        # Display game information
+        # Display game information; the overlay only re-renders the lines that changed
         info_text = [
-            f"FPS: {game_system.speed}",
-            f"Cells: {len(grid.cells)}",
-            f"Generation: {game_system.generation}",
+            f"FPS: {clock.get_fps():.0f}",
+            f"Speed: {game_system.speed} gen/s",
+            f"Cells: {population}",
+            f"Generation: {generation}",
+            f"Births: {latest['births']}  Deaths: {latest['deaths']}  Step: {latest['step_time'] * 1000:.1f} ms",
             f"{'Paused' if game_system.paused else 'Running'}",
-            f"Brush: {game_system.brush_size}x{game_system.brush_size}",
-            f"Mode: {game_system.mode}"
+            f"Brush: {game_system.brush_size}x{game_system.brush_size} {game_system.brush_shape}",
+            f"Mode: {game_system.mode}",
+            f"Rule: {game_system.rule} ({game_system.rule.notation}, {'torus' if game_system.wrap else 'bounded'})"
         ]
-        for i, text in enumerate(info_text):
-            text_surface = font.render(text, True, (255, 255, 255))
-            screen.blit(text_surface, (10, 10 + i * 30))
+        if worker.last_error:
+            info_text.append(f"Edit failed: {worker.last_error}")
+        hud_rect = hud.draw(screen, info_text)
         
-        pygame.display.flip()
-        clock.tick(game_system.speed)
+        # Refresh the HUD area of this frame and the previous one, plus changed cells
+        pygame.display.update(dirty_rects + [hud_rect, previous_hud_rect])
+        previous_hud_rect = hud_rect
+        clock.tick(RENDER_FPS)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
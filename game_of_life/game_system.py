@@ -44,4 +44,12 @@ GOSPER_GLIDER = Grid(
         (16, 11),
         (21, 7),
     },
-)
\ No newline at end of file
+)
+# Small patterns placed with add_pattern, as (dx, dy) offsets from the cursor
+PATTERNS = {
+    'glider': [(0, 0), (1, 1), (2, 1), (0, 2), (1, 2)],
+    'blinker': [(0, 0), (1, 0), (2, 0)],
+    'pulsar': [(2,0),(3,0),(4,0),(8,0),(9,0),(10,0),(0,2),(5,2),(7,2),(12,2),(0,3),(5,3),(7,3),(12,3),(0,4),(5,4),(7,4),(12,4),(2,5),(3,5),(4,5),(8,5),(9,5),(10,5),(2,7),(3,7),(4,7),(8,7),(9,7),(10,7),(0,8),(5,8),(7,8),(12,8),(0,9),(5,9),(7,9),(12,9),(0,10),(5,10),(7,10),(12,10),(2,12),(3,12),(4,12),(8,12),(9,12),(10,12)],
+    'spaceship': [(1,0),(4,0),(0,1),(0,2),(4,2),(0,3),(1,3),(2,3),(3,3)],
+    'pentadecathlon': [(0,0),(0,1),(0,2),(0,3),(0,4),(0,5),(0,6),(0,7),(0,8),(0,9)]
+}
@@ -0,0 +1,259 @@
+"""
+    Hashlife engine for the game of life.
+
+    The world is a quadtree of canonical nodes: identical sub-squares are the same
+    Python object, so the successor of every distinct square is computed once and
+    reused. A node of level k covers 2^k x 2^k cells and can be advanced 2^(k-2)
+    generations in a single call, which lets patterns jump 10^9 generations.
+
+    Hashlife runs on the unbounded plane. Grid.dim is only used when converting
+    back to a Grid, where cells outside the board are left out.
+"""
+from template_grid import Dim, Grid
+
+
+class Node:
+    """ A canonical quadtree node: a (top-left), b (top-right), c (bottom-left), d (bottom-right). """
+    __slots__ = ("k", "a", "b", "c", "d", "n")
+
+    def __init__(self, k: int, a, b, c, d, n: int):
+        self.k = k
+        self.a, self.b, self.c, self.d = a, b, c, d
+        self.n = n
+
+
+OFF = Node(0, None, None, None, None, 0)
+ON = Node(0, None, None, None, None, 1)
+
+
+class HashLifeEngine:
+    """ Advances a pattern by powers of two generations with memoized quadtree nodes. """
+
+    def __init__(self, max_cache: int = 2_000_000):
+        """ Initialize an empty world whose memo tables hold at most max_cache entries. """
+        self.max_cache = max_cache
+        self._nodes = {}
+        self._successors = {}
+        self._zeros = [OFF]
+        self._boxes = {}
+        self.root = self._join(OFF, OFF, OFF, OFF)
+        self.origin = (0, 0)  # Coordinates of the root's top-left cell
+        self.generation = 0
+
+    @classmethod
+    def from_grid(cls, grid: Grid, max_cache: int = 2_000_000) -> "HashLifeEngine":
+        """ Builds the quadtree for the live cells of a Grid. """
+        engine = cls(max_cache)
+        engine.set_cells(grid.cells)
+        return engine
+
+    # ---------------------------------------
+    # Node construction
+    # ---------------------------------------
+
+    def _join(self, a: Node, b: Node, c: Node, d: Node) -> Node:
+        """ Returns the canonical node with the given quadrants. """
+        key = (a, b, c, d)
+        node = self._nodes.get(key)
+        if node is None:
+            node = Node(a.k + 1, a, b, c, d, a.n + b.n + c.n + d.n)
+            self._nodes[key] = node
+        return node
+
+    def _zero(self, k: int) -> Node:
+        """ Returns the empty node of level k. """
+        while len(self._zeros) <= k:
+            z = self._zeros[-1]
+            self._zeros.append(self._join(z, z, z, z))
+        return self._zeros[k]
+
+    def _centre(self, m: Node) -> Node:
+        """ Returns a node one level up with m in its centre. """
+        z = self._zero(m.k - 1)
+        return self._join(
+            self._join(z, z, z, m.a), self._join(z, z, m.b, z),
+            self._join(z, m.c, z, z), self._join(m.d, z, z, z))
+
+    def set_cells(self, cells) -> None:
+        """ Replaces the world with the given (x, y) live cells. """
+        cells = list(cells)
+        self.generation = 0
+        if not cells:
+            self.root = self._zero(3)
+            self.origin = (0, 0)
+            return
+
+        min_x = min(x for x, _ in cells)
+        min_y = min(y for _, y in cells)
+        level = {(x - min_x, y - min_y): ON for x, y in cells}
+        k = 0
+        # Merge 2x2 blocks level by level until one node is left
+        while len(level) > 1 or k < 3:
+            z = self._zero(k)
+            parents = {}
+            for x, y in level:
+                parents.setdefault((x >> 1, y >> 1), None)
+            level = {
+                (px, py): self._join(
+                    level.get((2 * px, 2 * py), z), level.get((2 * px + 1, 2 * py), z),
+                    level.get((2 * px, 2 * py + 1), z), level.get((2 * px + 1, 2 * py + 1), z))
+                for px, py in parents
+            }
+            k += 1
+        (self.root,) = level.values()
+        self.origin = (min_x, min_y)
+
+    # ---------------------------------------
+    # Evolution
+    # ---------------------------------------
+
+    @staticmethod
+    def _life(a, b, c, d, e, f, g, h, i) -> Node:
+        """ Applies B3/S23 to the centre cell e of a 3x3 block of leaves. """
+        outer = a.n + b.n + c.n + d.n + f.n + g.n + h.n + i.n
+        return ON if outer == 3 or (e.n and outer == 2) else OFF
+
+    def _life_4x4(self, m: Node) -> Node:
+        """ Returns the centre 2x2 of a level 2 node, one generation later. """
+        life = self._life
+        ad = life(m.a.a, m.a.b, m.b.a, m.a.c, m.a.d, m.b.c, m.c.a, m.c.b, m.d.a)
+        bc = life(m.a.b, m.b.a, m.b.b, m.a.d, m.b.c, m.b.d, m.c.b, m.d.a, m.d.b)
+        cb = life(m.a.c, m.a.d, m.b.c, m.c.a, m.c.b, m.d.a, m.c.c, m.c.d, m.d.c)
+        da = life(m.a.d, m.b.c, m.b.d, m.c.b, m.d.a, m.d.b, m.c.d, m.d.c, m.d.d)
+        return self._join(ad, bc, cb, da)
+
+    def _successor(self, m: Node, j: int) -> Node:
+        """ Returns the centre of m (one level down) after 2^j generations, j <= m.k - 2. """
+        if m.n == 0:
+            return m.a
+        key = (m, j)
+        result = self._successors.get(key)
+        if result is not None:
+            return result
+
+        if m.k == 2:
+            result = self._life_4x4(m)
+        else:
+            join, successor = self._join, self._successor
+            c1 = successor(join(m.a.a, m.a.b, m.a.c, m.a.d), j)
+            c2 = successor(join(m.a.b, m.b.a, m.a.d, m.b.c), j)
+            c3 = successor(join(m.b.a, m.b.b, m.b.c, m.b.d), j)
+            c4 = successor(join(m.a.c, m.a.d, m.c.a, m.c.b), j)
+            c5 = successor(join(m.a.d, m.b.c, m.c.b, m.d.a), j)
+            c6 = successor(join(m.b.c, m.b.d, m.d.a, m.d.b), j)
+            c7 = successor(join(m.c.a, m.c.b, m.c.c, m.c.d), j)
+            c8 = successor(join(m.c.b, m.d.a, m.c.d, m.d.c), j)
+            c9 = successor(join(m.d.a, m.d.b, m.d.c, m.d.d), j)
+            if j < m.k - 2:
+                # Each sub-result already moved 2^j generations: keep their centres
+                result = join(
+                    join(c1.d, c2.c, c4.b, c5.a), join(c2.d, c3.c, c5.b, c6.a),
+                    join(c4.d, c5.c, c7.b, c8.a), join(c5.d, c6.c, c8.b, c9.a))
+            else:
+                # Half the step is done: advance the four overlapping squares again
+                result = join(
+                    successor(join(c1, c2, c4, c5), j), successor(join(c2, c3, c5, c6), j),
+                    successor(join(c4, c5, c7, c8), j), successor(join(c5, c6, c8, c9), j))
+
+        self._successors[key] = result
+        return result
+
+    def _is_padded(self, m: Node) -> bool:
+        """ True if all live cells of m sit in its central quarter. """
+        return (m.a.n == m.a.d.d.n and m.b.n == m.b.c.c.n
+                and m.c.n == m.c.b.b.n and m.d.n == m.d.a.a.n)
+
+    def _grow(self) -> None:
+        """ Wraps the root in empty space, keeping cell coordinates unchanged. """
+        half = 1 << (self.root.k - 1)
+        self.root = self._centre(self.root)
+        self.origin = (self.origin[0] - half, self.origin[1] - half)
+
+    def step_pow2(self, j: int) -> None:
+        """ Advances the world by 2^j generations in one call. """
+        while self.root.k < j + 3 or not self._is_padded(self.root):
+            self._grow()
+        quarter = 1 << (self.root.k - 2)
+        self.root = self._successor(self.root, j)
+        self.origin = (self.origin[0] + quarter, self.origin[1] + quarter)
+        self.generation += 1 << j
+        self._trim_caches()
+
+    def step(self, generations: int = 1) -> None:
+        """ Advances the world by any number of generations, one power of two per set bit. """
+        j = 0
+        while generations:
+            if generations & 1:
+                self.step_pow2(j)
+            generations >>= 1
+            j += 1
+
+    def _trim_caches(self) -> None:
+        """ Drops the memo tables once they exceed max_cache entries.
+
+        Nodes still referenced by the root stay valid; only sharing with older
+        nodes is lost until the tables fill up again.
+        """
+        if len(self._nodes) + len(self._successors) > self.max_cache:
+            self._nodes.clear()
+            self._successors.clear()
+            self._boxes.clear()
+            self._zeros = [OFF]
+
+    # ---------------------------------------
+    # Queries
+    # ---------------------------------------
+
+    @property
+    def population(self) -> int:
+        """ Number of live cells, read from the root without expanding the tree. """
+        return self.root.n
+
+    def _box(self, m: Node) -> tuple:
+        """ Returns (min_x, min_y, max_x, max_y) of live cells relative to m, memoized per node. """
+        if m.k == 0:
+            return (0, 0, 0, 0)
+        box = self._boxes.get(m)
+        if box is None:
+            half = 1 << (m.k - 1)
+            boxes = [
+                (bx0 + dx, by0 + dy, bx1 + dx, by1 + dy)
+                for child, dx, dy in ((m.a, 0, 0), (m.b, half, 0), (m.c, 0, half), (m.d, half, half))
+                if child.n
+                for bx0, by0, bx1, by1 in (self._box(child),)
+            ]
+            box = (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                   max(b[2] for b in boxes), max(b[3] for b in boxes))
+            self._boxes[m] = box
+        return box
+
+    def bounding_box(self) -> tuple:
+        """ Returns (min_x, min_y, max_x, max_y) of the live cells, or None if empty. """
+        if self.root.n == 0:
+            return None
+        min_x, min_y, max_x, max_y = self._box(self.root)
+        x0, y0 = self.origin
+        return (x0 + min_x, y0 + min_y, x0 + max_x, y0 + max_y)
+
+    def to_cells(self, window: tuple = None) -> set:
+        """ Expands the live cells, optionally only inside window = (min_x, min_y, max_x, max_y). """
+        cells = set()
+        stack = [(self.root, self.origin[0], self.origin[1])]
+        while stack:
+            m, x, y = stack.pop()
+            if m.n == 0:
+                continue
+            size = 1 << m.k
+            if window is not None and (x > window[2] or y > window[3]
+                                       or x + size <= window[0] or y + size <= window[1]):
+                continue
+            if m.k == 0:
+                cells.add((x, y))
+                continue
+            half = size >> 1
+            stack.extend(((m.a, x, y), (m.b, x + half, y), (m.c, x, y + half), (m.d, x + half, y + half)))
+        return cells
+
+    def to_grid(self, dim: Dim) -> Grid:
+        """ Converts the cells inside a board of the given dimensions back into a Grid. """
+        return Grid(dim, self.to_cells((0, 0, dim.width - 1, dim.height - 1)))
@@ -0,0 +1,227 @@
+"""
+    Headless runner for the game of life.
+
+    Loads a pattern, runs it for a number of generations without opening a window
+    and reports the throughput, the peak memory and the final population:
+
+        python headless.py gosper --generations 10000
+        python headless.py pulsar --size 200x200 --engine sparse
+        python headless.py acorn --size 400x400 --generations 5206
+        python headless.py pulsar --generations 1000000000 --skip-cycles
+        python headless.py r_pentomino --size 200x200 --rule B36/S23 --bounded
+        python headless.py my_pattern.rle --engine hashlife --generations 1000000
+        python headless.py acorn --size 400x400 --generations 5206 --metrics acorn.csv
+
+    The dense, sparse and parallel engines wrap around the board edges; Hashlife
+    runs on the unbounded plane, so patterns that reach the edge give different
+    populations. Peak memory only covers the main process. With --metrics, a
+    separate run of the dense or parallel engine records the population, births,
+    deaths, bounding box and step time of every generation (the last million for
+    longer runs) to a CSV or Parquet file.
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from collections import namedtuple
+
+from game_system import GOSPER_GLIDER, PATTERNS
+from cycle_detector import CycleDetector
+from hashlife import HashLifeEngine
+from instrumentation import Metrics, step_with_metrics
+from life_engine import LifeEngine, SparseLifeEngine
+from parallel_engine import ParallelLifeEngine
+from pattern_library import PATTERN_EXTENSIONS, PatternLibrary, read_pattern
+from rules import LIFE, RULES, Rule
+from template_grid import Dim, Grid
+
+ENGINES = ("dense", "sparse", "hashlife", "parallel")
+DEFAULT_DIM = Dim(50, 50)
+MAX_METRICS_ROWS = 1_000_000  # About 64 MB; longer --metrics runs keep the latest generations
+
+RunResult = namedtuple(
+    "RunResult", ["engine", "generations", "seconds", "generations_per_second", "peak_memory", "population", "cycle"],
+    defaults=[None])
+
+
+def read_cells_file(path: str) -> set:
+    """ Reads a plaintext (.cells) pattern: '!' comment lines, 'O' or '*' for live cells. """
+    cells = set()
+    with open(path) as file:
+        y = 0
+        for line in file:
+            line = line.rstrip("\n")
+            if line.startswith("!"):
+                continue
+            cells.update((x, y) for x, char in enumerate(line) if char in "O*")
+            y += 1
+    return cells
+
+
+def centre_cells(cells, dim: Dim) -> Grid:
+    """ Places a set of (x, y) offsets in the middle of a board of the given size. """
+    if not cells:
+        return Grid(dim, set())
+    min_x = min(x for x, _ in cells)
+    min_y = min(y for _, y in cells)
+    max_x = max(x for x, _ in cells)
+    max_y = max(y for _, y in cells)
+    if max_x - min_x >= dim.width or max_y - min_y >= dim.height:
+        raise ValueError(f"The pattern does not fit on a {dim.width}x{dim.height} board.")
+    dx = (dim.width - (max_x - min_x + 1)) // 2 - min_x
+    dy = (dim.height - (max_y - min_y + 1)) // 2 - min_y
+    return Grid(dim, {(x + dx, y + dy) for x, y in cells})
+
+
+def load_pattern(name: str, dim: Dim = None, library: PatternLibrary = None) -> Grid:
+    """ Returns the Grid for 'gosper', a name from PATTERNS or the pattern library,
+    or a path to a .cells, .rle, .lif or .life file.
+
+    Without dim, the Gosper glider gun keeps its own board and other patterns are
+    centred on a 50x50 board.
+    """
+    if name.lower() in ("gosper", "gosper_glider"):
+        if dim is None or tuple(dim) == tuple(GOSPER_GLIDER.dim):
+            return GOSPER_GLIDER
+        return centre_cells(GOSPER_GLIDER.cells, dim)
+    if name in PATTERNS:
+        return centre_cells(set(PATTERNS[name]), dim or DEFAULT_DIM)
+    if name.lower().endswith(PATTERN_EXTENSIONS):
+        cells = read_pattern(name)
+    elif os.path.isfile(name):
+        return centre_cells(read_cells_file(name), dim or DEFAULT_DIM)
+    else:
+        cells = (library or PatternLibrary()).load(name)
+    return centre_cells(set(zip(cells[:, 0].tolist(), cells[:, 1].tolist())), dim or DEFAULT_DIM)
+
+
+def make_engine(engine: str, grid: Grid, rule: Rule = LIFE, wrap: bool = True):
+    """ Builds the named engine for a Grid, without cell age tracking.
+
+    Only the dense and parallel engines run other rules and bounded boards.
+    The parallel engine holds worker processes until close_engine is called.
+    """
+    if engine == "dense":
+        life = LifeEngine.from_grid(grid, rule=rule, wrap=wrap)
+        life.track_age = False
+        return life
+    if engine == "parallel":
+        return ParallelLifeEngine.from_grid(grid, rule=rule, wrap=wrap)
+    if rule != LIFE or not wrap:
+        raise ValueError(f"The {engine} engine only runs Life on the torus; use the dense or parallel engine.")
+    if engine == "sparse":
+        return SparseLifeEngine.from_grid(grid)
+    if engine == "hashlife":
+        return HashLifeEngine.from_grid(grid)
+    raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}.")
+
+
+def close_engine(life) -> None:
+    """ Releases the worker processes and shared memory of engines that have them. """
+    close = getattr(life, "close", None)
+    if close is not None:
+        close()
+
+
+def _advance(life, generations: int, skip_cycles: bool):
+    """ Steps an engine, jumping over repeated periods with a CycleDetector if asked. """
+    if not skip_cycles:
+        life.step(generations)
+        return None
+    return CycleDetector().advance(life, generations)
+
+
+def run(grid: Grid, generations: int, engine: str = "dense", measure_memory: bool = True,
+        skip_cycles: bool = False, rule: Rule = LIFE, wrap: bool = True) -> tuple:
+    """ Runs a Grid for the given number of generations and returns (RunResult, engine).
+    Pass the engine to close_engine when done with it.
+
+    Throughput is timed on a plain run. tracemalloc slows Python code down, so the
+    peak memory comes from a second, traced run (None with measure_memory=False).
+    With skip_cycles, the dense and sparse engines stop computing generations once
+    the board repeats, and the RunResult reports the Cycle found.
+    """
+    if skip_cycles and engine == "hashlife":
+        raise ValueError("Cycle skipping needs the dense, sparse or parallel engine.")
+    life = make_engine(engine, grid, rule, wrap)
+    start = time.perf_counter()
+    cycle = _advance(life, generations, skip_cycles)
+    seconds = time.perf_counter() - start
+
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        traced = make_engine(engine, grid, rule, wrap)
+        try:
+            _advance(traced, generations, skip_cycles)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            close_engine(traced)
+
+    return RunResult(engine, generations, seconds, generations / seconds if seconds else float("inf"),
+                     peak_memory, life.population, cycle), life
+
+
+def parse_size(text: str) -> Dim:
+    """ Parses 'WIDTHxHEIGHT' into a Dim. """
+    width, _, height = text.lower().partition("x")
+    return Dim(int(width), int(height or width))
+
+
+def format_result(result: RunResult) -> str:
+    """ Formats a RunResult as one line of text. """
+    memory = "n/a" if result.peak_memory is None else f"{result.peak_memory / 2**20:.1f} MiB"
+    return (f"{result.engine}: {result.generations} generations in {result.seconds:.3f}s "
+            f"({result.generations_per_second:,.0f} gen/s), peak memory {memory}, "
+            f"final population {result.population}"
+            + (f", period {result.cycle.period} from generation {result.cycle.start}" if result.cycle else ""))
+
+
+def main(argv=None):
+    """ Command line entry point. """
+    parser = argparse.ArgumentParser(description="Run the game of life without a display.")
+    parser.add_argument("pattern", nargs="?", default="gosper",
+                        help="'gosper', one of " + ", ".join(PATTERNS) + ", a library pattern, "
+                             "or a .cells, .rle or .lif file")
+    parser.add_argument("-n", "--generations", type=int, default=1000)
+    parser.add_argument("-e", "--engine", choices=ENGINES, default="dense")
+    parser.add_argument("-s", "--size", type=parse_size, help="board size as WIDTHxHEIGHT")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run for peak memory")
+    parser.add_argument("--skip-cycles", action="store_true",
+                        help="detect still lifes and oscillators and jump over their periods")
+    parser.add_argument("-r", "--rule", type=Rule.parse, default=LIFE,
+                        help="rule name (" + ", ".join(RULES) + ") or B/S notation such as B36/S23")
+    parser.add_argument("--bounded", action="store_true", help="dead cells beyond the edges instead of a torus")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write per-generation metrics to a .csv or .parquet file (dense and parallel engines)")
+    args = parser.parse_args(argv)
+    if args.engine in ("sparse", "hashlife") and (args.rule != LIFE or args.bounded):
+        parser.error(f"the {args.engine} engine only runs Life on the torus; use --engine dense or parallel")
+    if args.metrics and args.engine not in ("dense", "parallel"):
+        parser.error("--metrics needs the dense or parallel engine")
+
+    try:
+        grid = load_pattern(args.pattern, args.size)
+    except KeyError as error:  # Unknown library pattern
+        parser.error(error.args[0])
+    except (ValueError, OSError) as error:  # Pattern too large for the board, unreadable or missing file
+        parser.error(str(error))
+    result, life = run(grid, args.generations, args.engine, not args.no_memory, args.skip_cycles,
+                       args.rule, not args.bounded)
+    close_engine(life)
+    print(format_result(result))
+
+    if args.metrics:
+        # A separate run, so recording the metrics does not slow down the timed one
+        metrics = Metrics(min(args.generations + 1, MAX_METRICS_ROWS))
+        instrumented = make_engine(args.engine, grid, args.rule, not args.bounded)
+        try:
+            step_with_metrics(instrumented, args.generations, metrics)
+        finally:
+            close_engine(instrumented)
+        metrics.export(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+    Generation history for the game of life.
+
+    Generations are stored in a ring buffer. A keyframe holds the whole board as
+    packed bits (one bit per cell); the generations after it only hold the flat
+    indices of the cells that changed. Any generation is rebuilt from the nearest
+    keyframe before it plus at most keyframe_interval deltas, which makes rewind
+    and scrubbing cheap while thousands of generations fit in a few megabytes.
+"""
+from bisect import bisect_right
+
+import numpy as np
+
+DEFAULT_CAPACITY = 4096
+DEFAULT_KEYFRAME_INTERVAL = 64
+
+
+class History:
+    """ Ring buffer of board states with periodic keyframes and delta-encoded changes. """
+
+    def __init__(self, width: int, height: int, capacity: int = DEFAULT_CAPACITY,
+                 keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        """ Initialize an empty history holding about capacity generations.
+
+        Old generations are dropped a keyframe group at a time, so up to
+        keyframe_interval more generations than capacity may be kept.
+        """
+        self.shape = (width, height)
+        self.capacity = capacity
+        self.keyframe_interval = keyframe_interval
+        self._generations = []
+        self._keyframes = []
+        self._data = []
+        self._since_keyframe = 0
+        self._last = None  # Board of the generation the next delta is taken against
+        self._last_generation = None
+
+    def __len__(self) -> int:
+        return len(self._generations)
+
+    @property
+    def first(self) -> int:
+        """ Oldest generation in the history. """
+        return self._generations[0]
+
+    @property
+    def last(self) -> int:
+        """ Newest generation in the history. """
+        return self._generations[-1]
+
+    @property
+    def nbytes(self) -> int:
+        """ Memory used by the stored keyframes and deltas. """
+        return sum(data.nbytes for data in self._data)
+
+    def __contains__(self, generation: int) -> bool:
+        index = bisect_right(self._generations, generation) - 1
+        return index >= 0 and self._generations[index] == generation
+
+    def record(self, board: np.ndarray, generation: int) -> None:
+        """ Stores a board as the given generation.
+
+        Recording a generation that is already stored with the same board (such
+        as stepping on after a rewind) keeps the newer generations. Recording a
+        different board for it (after an edit) drops the stored generations from
+        there on.
+        """
+        if board.shape != self.shape:
+            raise ValueError(f"Board shape {board.shape} does not match the history shape {self.shape}.")
+        if generation == self._last_generation and np.array_equal(board, self._last):
+            return
+        if self._generations and generation <= self.last:
+            if generation in self and np.array_equal(board, self.board_at(generation)):
+                np.copyto(self._last, board)
+                self._last_generation = generation
+                return
+            self._truncate(generation)
+
+        changed = None
+        if self._last is not None and self._generations and generation == self.last + 1 \
+                and self._since_keyframe < self.keyframe_interval:
+            changed = np.flatnonzero(board != self._last).astype(np.uint32)
+            # A chaotic board can change so much that a keyframe is smaller
+            if changed.nbytes >= board.size // 8:
+                changed = None
+
+        if changed is None:
+            self._generations.append(generation)
+            self._keyframes.append(True)
+            self._data.append(np.packbits(board.view(bool)))
+            self._since_keyframe = 0
+        else:
+            self._generations.append(generation)
+            self._keyframes.append(False)
+            self._data.append(changed)
+            self._since_keyframe += 1
+
+        if self._last is None:
+            self._last = board.copy()
+        else:
+            np.copyto(self._last, board)
+        self._last_generation = generation
+        self._evict()
+
+    def _truncate(self, generation: int) -> None:
+        """ Drops every generation from the given one on. """
+        index = bisect_right(self._generations, generation - 1)
+        del self._generations[index:], self._keyframes[index:], self._data[index:]
+        self._continue_from_last()
+
+    def _continue_from_last(self) -> None:
+        """ Takes the next delta against the newest stored generation. """
+        self._since_keyframe = 0
+        self._last_generation = None
+        if self._generations:
+            self._last = self.board_at(self.last)
+            self._last_generation = self.last
+            self._since_keyframe = len(self._keyframes) - 1 - self._keyframe_index(len(self._keyframes) - 1)
+
+    def _evict(self) -> None:
+        """ Drops the oldest keyframe group while the history is over capacity. """
+        while len(self._generations) > self.capacity:
+            try:
+                next_keyframe = self._keyframes.index(True, 1)
+            except ValueError:
+                return
+            del self._generations[:next_keyframe], self._keyframes[:next_keyframe], self._data[:next_keyframe]
+
+    def _keyframe_index(self, index: int) -> int:
+        """ Returns the position of the keyframe at or before position index. """
+        while not self._keyframes[index]:
+            index -= 1
+        return index
+
+    def board_at(self, generation: int) -> np.ndarray:
+        """ Rebuilds the board of a stored generation as a new uint8 array. """
+        index = bisect_right(self._generations, generation) - 1
+        if index < 0 or self._generations[index] != generation:
+            raise KeyError(f"Generation {generation} is not in the history.")
+        start = self._keyframe_index(index)
+        flat = np.unpackbits(self._data[start], count=self.shape[0] * self.shape[1])
+        for changed in self._data[start + 1:index + 1]:
+            flat[changed] ^= 1
+        return flat.reshape(self.shape)
+
+    def seek(self, generation: int) -> np.ndarray:
+        """ Returns the board of a stored generation and continues recording from it.
+
+        The newer generations stay available for scrubbing forward until a
+        board that differs from the stored one is recorded.
+        """
+        board = self.board_at(generation)
+        self._last = board.copy()
+        self._last_generation = generation
+        return board
+
+    def save(self, path: str) -> None:
+        """ Writes the history to a compressed .npz file. """
+        keyframes = np.array(self._keyframes, dtype=bool)
+        sizes = np.array([len(data) for data in self._data], dtype=np.int64)
+        np.savez_compressed(
+            path,
+            shape=np.array(self.shape, dtype=np.int64),
+            settings=np.array([self.capacity, self.keyframe_interval], dtype=np.int64),
+            generations=np.array(self._generations, dtype=np.int64),
+            keyframes=keyframes,
+            sizes=sizes,
+            packed=np.concatenate([d for d, k in zip(self._data, self._keyframes) if k] or [np.empty(0, np.uint8)]),
+            changed=np.concatenate([d for d, k in zip(self._data, self._keyframes) if not k]
+                                   or [np.empty(0, np.uint32)]),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "History":
+        """ Reads a history written by save(), positioned at its newest generation. """
+        with np.load(path) as file:
+            width, height = file["shape"].tolist()
+            capacity, keyframe_interval = file["settings"].tolist()
+            history = cls(width, height, capacity, keyframe_interval)
+            packed, changed = file["packed"], file["changed"]
+            packed_offset = changed_offset = 0
+            for generation, keyframe, size in zip(file["generations"].tolist(), file["keyframes"].tolist(),
+                                                  file["sizes"].tolist()):
+                if keyframe:
+                    data, packed_offset = packed[packed_offset:packed_offset + size], packed_offset + size
+                else:
+                    data, changed_offset = changed[changed_offset:changed_offset + size], changed_offset + size
+                history._generations.append(generation)
+                history._keyframes.append(keyframe)
+                history._data.append(data)
+        history._continue_from_last()
+        return history
@@ -0,0 +1,147 @@
+"""
+    Per-generation instrumentation for game of life runs.
+
+    Metrics records population, births, deaths, the bounding box of the live
+    cells and the step and render times of every generation into a preallocated
+    structured array used as a ring buffer, so recording never allocates. The
+    series can be exported as CSV or Parquet. HudOverlay draws text lines and only
+    re-renders a line when its text changes.
+"""
+import importlib.util
+import time
+
+import numpy as np
+
+PARQUET_AVAILABLE = importlib.util.find_spec("pandas") is not None and importlib.util.find_spec("pyarrow") is not None
+
+METRICS_DTYPE = np.dtype([
+    ("generation", np.int64),
+    ("population", np.int64),
+    ("births", np.int64),
+    ("deaths", np.int64),
+    ("min_x", np.int32),
+    ("min_y", np.int32),
+    ("max_x", np.int32),
+    ("max_y", np.int32),
+    ("step_time", np.float64),
+    ("render_time", np.float64),
+])
+DEFAULT_CAPACITY = 10000
+
+
+class Metrics:
+    """ Ring buffer of per-generation measurements for a dense board. """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """ Initialize a buffer holding the last capacity generations. """
+        self.capacity = capacity
+        self._rows = np.zeros(capacity, dtype=METRICS_DTYPE)
+        self._count = 0  # Rows recorded so far, including overwritten ones
+        self._previous = None
+        self._changed = None
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def reset(self) -> None:
+        """ Forgets the recorded rows and the previous board. """
+        self._count = 0
+        self._previous = None
+
+    def record(self, board: np.ndarray, generation: int, step_time: float = 0.0) -> None:
+        """ Records a generation; births and deaths are counted against the previously recorded board. """
+        alive = board.view(bool)
+        row = self._rows[self._count % self.capacity]
+        row["generation"] = generation
+        row["population"] = np.count_nonzero(alive)
+        row["step_time"] = step_time
+        row["render_time"] = np.nan
+
+        if self._previous is None or self._previous.shape != alive.shape:
+            self._previous = alive.copy()
+            self._changed = np.empty_like(alive)
+            row["births"] = row["deaths"] = 0
+        else:
+            np.greater(alive, self._previous, out=self._changed)
+            row["births"] = np.count_nonzero(self._changed)
+            row["deaths"] = row["births"] + np.count_nonzero(self._previous) - row["population"]
+            np.copyto(self._previous, alive)
+
+        if row["population"]:
+            xs = np.flatnonzero(alive.any(axis=1))
+            ys = np.flatnonzero(alive.any(axis=0))
+            row["min_x"], row["max_x"], row["min_y"], row["max_y"] = xs[0], xs[-1], ys[0], ys[-1]
+        else:
+            row["min_x"] = row["max_x"] = row["min_y"] = row["max_y"] = -1
+        self._count += 1
+
+    def record_render(self, render_time: float) -> None:
+        """ Stores the time it took to draw the latest recorded generation. """
+        if self._count:
+            self._rows[(self._count - 1) % self.capacity]["render_time"] = render_time
+
+    @property
+    def latest(self) -> np.void:
+        """ The most recent row, or None before the first record. """
+        return self._rows[(self._count - 1) % self.capacity] if self._count else None
+
+    def rows(self) -> np.ndarray:
+        """ Returns a copy of the recorded rows, oldest first. """
+        if self._count <= self.capacity:
+            return self._rows[:self._count].copy()
+        start = self._count % self.capacity
+        return np.concatenate([self._rows[start:], self._rows[:start]])
+
+    def to_csv(self, path: str) -> None:
+        """ Writes the recorded rows to a CSV file with a header line. """
+        rows = self.rows()
+        formats = ["%d"] * 8 + ["%.9f"] * 2
+        np.savetxt(path, rows, delimiter=",", fmt=formats, header=",".join(METRICS_DTYPE.names), comments="")
+
+    def to_parquet(self, path: str) -> None:
+        """ Writes the recorded rows to a Parquet file. Needs pandas and pyarrow. """
+        if not PARQUET_AVAILABLE:
+            raise ImportError("Exporting to Parquet requires pandas and pyarrow.")
+        import pandas as pd
+        pd.DataFrame(self.rows()).to_parquet(path, index=False)
+
+    def export(self, path: str) -> None:
+        """ Writes the rows as Parquet for a .parquet path and as CSV otherwise. """
+        if path.lower().endswith(".parquet"):
+            self.to_parquet(path)
+        else:
+            self.to_csv(path)
+
+
+def step_with_metrics(engine, generations: int, metrics: Metrics) -> None:
+    """ Steps a dense engine one generation at a time, recording each one. """
+    if not len(metrics):
+        metrics.record(engine.board, engine.generation)
+    for _ in range(generations):
+        start = time.perf_counter()
+        engine.step()
+        metrics.record(engine.board, engine.generation, time.perf_counter() - start)
+
+
+class HudOverlay:
+    """ Draws lines of text, re-rendering only the lines whose text changed. """
+
+    def __init__(self, font: "pygame.font.Font", colour=(255, 255, 255), line_height: int = 30):
+        """ Initialize an empty cache of rendered lines. """
+        self.font = font
+        self.colour = colour
+        self.line_height = line_height
+        self._lines = []  # (text, surface) per line
+
+    def draw(self, screen: "pygame.Surface", lines: list, position=(10, 10)) -> "pygame.Rect":
+        """ Blits the lines and returns the rectangle they cover. """
+        import pygame  # Only the overlay needs pygame; headless runs record metrics without it
+        del self._lines[len(lines):]
+        rects = []
+        for i, text in enumerate(lines):
+            if i == len(self._lines):
+                self._lines.append((None, None))
+            if self._lines[i][0] != text:
+                self._lines[i] = (text, self.font.render(text, True, self.colour))
+            rects.append(screen.blit(self._lines[i][1], (position[0], position[1] + i * self.line_height)))
+        return rects[0].unionall(rects[1:]) if rects else pygame.Rect(position, (0, 0))
@@ -0,0 +1,182 @@
+"""
+    Multi-core engine for very large game of life boards.
+
+    The board lives in two shared-memory buffers (current and next generation).
+    Each worker process owns a band of rows (consecutive x values, which are
+    contiguous in memory) and steps it with its own LifeEngine: every generation
+    it copies its band plus one halo row on each side from the current buffer,
+    steps it and writes the band into the next buffer. Halo rows are read straight
+    from shared memory, so nothing is pickled per generation, and the workers meet
+    at a barrier before the next generation reads the buffer they just wrote.
+    The result is bit for bit the same as a single LifeEngine.
+"""
+import multiprocessing
+import os
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from life_engine import LifeEngine, board_to_cells, grid_to_board
+from rules import LIFE, Rule
+from template_grid import Dim, Grid
+
+_GENERATIONS, _CURRENT, _STOP = range(3)
+WORKER_POLL_SECONDS = 0.5  # How often a waiting main process checks that the workers are still alive
+WORKER_JOIN_SECONDS = 5  # How long close() waits for a worker before terminating it
+
+
+def _band_worker(buffer_names, shape, x0, x1, rule, wrap, control, start, step_done, finished):
+    """ Worker process: steps rows x0 to x1 - 1 whenever the main process asks for generations.
+
+    start is this worker's semaphore, released by the main process once per call, and
+    finished is a semaphore every worker releases when done; step_done is a barrier between the workers, aborted by the main
+    process if one of them dies.
+    """
+    buffers = [shared_memory.SharedMemory(name=name) for name in buffer_names]
+    try:
+        boards = [np.ndarray(shape, dtype=np.uint8, buffer=buffer.buf) for buffer in buffers]
+        width = shape[0]
+        band = LifeEngine(x1 - x0 + 2, shape[1], track_age=False, rule=rule, wrap=wrap)
+        while True:
+            start.acquire()
+            if control[_STOP]:
+                return
+            generations, current = control[_GENERATIONS], control[_CURRENT]
+            for i in range(generations):
+                source, target = boards[(current + i) % 2], boards[(current + i + 1) % 2]
+                local = band.board
+                local[1:-1] = source[x0:x1]
+                # Halo rows; on a bounded board there is nothing beyond the first and last row
+                local[0] = source[x0 - 1] if wrap or x0 > 0 else 0
+                local[-1] = source[x1 % width] if wrap or x1 < width else 0
+                band.step()
+                target[x0:x1] = band.board[1:-1]
+                if i < generations - 1:
+                    step_done.wait()
+            finished.release()
+    except threading.BrokenBarrierError:
+        pass  # Another worker died; the main process reports it
+    finally:
+        boards = None
+        for buffer in buffers:
+            buffer.close()
+
+
+class ParallelLifeEngine:
+    """ Steps a dense board with one worker process per band of rows. """
+
+    def __init__(self, width: int, height: int, workers: int = None, rule: Rule = LIFE, wrap: bool = True):
+        """ Initialize an empty board in shared memory and start the workers.
+
+        Cell ages are not tracked. Call close() (or use the engine as a context
+        manager) to stop the workers and free the shared memory.
+        """
+        if width < 3 or height < 3:
+            raise ValueError("The board must be at least 3x3 cells.")
+        workers = max(1, min(workers or os.cpu_count() or 1, width))
+        self.dim = Dim(width, height)
+        self.rule = rule
+        self.wrap = wrap
+        self.track_age = False
+        self.generation = 0
+        self._current = 0
+        self._buffers = [shared_memory.SharedMemory(create=True, size=width * height) for _ in range(2)]
+        self._boards = [np.ndarray((width, height), dtype=np.uint8, buffer=buffer.buf) for buffer in self._buffers]
+        for board in self._boards:
+            board.fill(0)
+
+        context = multiprocessing.get_context()
+        self._control = context.RawArray("q", 3)
+        self._start = [context.Semaphore(0) for _ in range(workers)]
+        self._step_done = context.Barrier(workers)
+        self._finished = context.Semaphore(0)
+        bounds = np.linspace(0, width, workers + 1).astype(int)
+        self._workers = [
+            context.Process(
+                target=_band_worker, daemon=True,
+                args=([buffer.name for buffer in self._buffers], (width, height), int(x0), int(x1), rule, wrap,
+                      self._control, start, self._step_done, self._finished))
+            for x0, x1, start in zip(bounds[:-1], bounds[1:], self._start)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @classmethod
+    def from_grid(cls, grid: Grid, workers: int = None, rule: Rule = LIFE, wrap: bool = True) -> "ParallelLifeEngine":
+        """ Builds an engine from a Grid. """
+        engine = cls(grid.dim.width, grid.dim.height, workers, rule, wrap)
+        engine.board[...] = grid_to_board(grid)
+        return engine
+
+    @property
+    def board(self) -> np.ndarray:
+        """ The current generation, a (width, height) uint8 view of shared memory. """
+        return self._boards[self._current]
+
+    @property
+    def population(self) -> int:
+        """ Number of live cells. """
+        return int(np.count_nonzero(self.board))
+
+    def step(self, generations: int = 1) -> None:
+        """ Advances the board by the given number of generations.
+
+        Raises RuntimeError if a worker process has died, e.g. killed for running out of memory.
+        """
+        if generations <= 0:
+            return
+        self._check_workers()
+        self._control[_GENERATIONS] = generations
+        self._control[_CURRENT] = self._current
+        for start in self._start:
+            start.release()
+        for _ in self._workers:
+            while not self._finished.acquire(timeout=WORKER_POLL_SECONDS):
+                self._check_workers()
+        self._current = (self._current + generations) % 2
+        self.generation += generations
+
+    def _check_workers(self) -> None:
+        """ Raises RuntimeError, releasing the surviving workers, if a worker process has exited. """
+        for worker in self._workers:
+            if not worker.is_alive():
+                self._step_done.abort()
+                raise RuntimeError(f"A worker process exited unexpectedly with code {worker.exitcode}.")
+
+    def to_cells(self) -> set:
+        """ Returns the live cells as a set of (x, y) tuples. """
+        return board_to_cells(self.board)
+
+    def to_grid(self) -> Grid:
+        """ Converts the board back into a Grid. """
+        return Grid(self.dim, self.to_cells())
+
+    def close(self) -> None:
+        """ Stops the workers and releases the shared memory. """
+        if self._workers:
+            self._control[_STOP] = 1
+            self._step_done.abort()
+            for start in self._start:
+                start.release()
+            for worker in self._workers:
+                worker.join(WORKER_JOIN_SECONDS)
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+            self._workers = []
+        if self._buffers:
+            self._boards = []
+            for buffer in self._buffers:
+                try:
+                    buffer.close()
+                except BufferError:
+                    pass  # A caller still holds a view of the board; the memory goes with it
+                buffer.unlink()
+            self._buffers = []
+
+    def __enter__(self) -> "ParallelLifeEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,217 @@
+"""
+    Pattern files for the game of life.
+
+    Reads the RLE and Life 1.06 formats line by line. Runs of live cells are kept
+    as compact integer buffers and expanded into one (n, 2) int32 coordinate array
+    at the end, so large patterns never build a list of Python tuples.
+
+    PatternLibrary indexes a directory of pattern files by name and bounding box
+    from their headers, parses a pattern only when it is first used and keeps the
+    parsed arrays in a small cache.
+"""
+import os
+import re
+from array import array
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+PATTERN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "patterns")
+PATTERN_EXTENSIONS = (".rle", ".lif", ".life")
+
+PatternInfo = namedtuple("PatternInfo", ["name", "path", "width", "height", "rule"])
+
+_RLE_HEADER = re.compile(r"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?", re.IGNORECASE)
+_RLE_TOKEN = re.compile(r"(\d*)([^\d\s])")
+_TRAILING_COUNT = re.compile(r"\d+$")
+
+
+def _read_rle_header(file) -> tuple:
+    """ Reads the comment and header lines of an RLE file, returning (width, height, rule).
+
+    The file is left positioned at the first line of pattern data. Files without an
+    'x = .., y = ..' line give (None, None, None) and are read from the start.
+    """
+    while True:
+        position = file.tell()
+        line = file.readline()
+        if not line:
+            return None, None, None
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        match = _RLE_HEADER.match(line)
+        if match:
+            width, height, rule = match.groups()
+            return int(width), int(height), rule
+        file.seek(position)
+        return None, None, None
+
+
+def _rle_runs(lines):
+    """ Yields (x, y, length) for every run of live cells in the data lines of an RLE pattern. """
+    x = y = 0
+    pending = ""
+    for line in lines:
+        line = pending + line.strip()
+        # A run count may be split from its tag by a line break
+        trailing = _TRAILING_COUNT.search(line)
+        pending = trailing.group() if trailing else ""
+        if trailing:
+            line = line[:trailing.start()]
+        for count, tag in _RLE_TOKEN.findall(line):
+            n = int(count) if count else 1
+            if tag == "!":
+                return
+            if tag == "$":
+                x, y = 0, y + n
+            elif tag in "b.":
+                x += n
+            else:
+                yield x, y, n
+                x += n
+
+
+def _expand_runs(xs: array, ys: array, lengths: array) -> np.ndarray:
+    """ Expands runs of live cells into an (n, 2) int32 array of coordinates. """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    cells = np.empty((int(lengths.sum()), 2), dtype=np.int32)
+    run_starts = np.cumsum(lengths) - lengths
+    offsets = np.arange(len(cells)) - np.repeat(run_starts, lengths)
+    cells[:, 0] = np.repeat(np.asarray(xs, dtype=np.int32), lengths) + offsets
+    cells[:, 1] = np.repeat(np.asarray(ys, dtype=np.int32), lengths)
+    return cells
+
+
+def read_rle(path: str) -> np.ndarray:
+    """ Parses an RLE file into an (n, 2) int32 array of (x, y) live cells. """
+    xs, ys, lengths = array("i"), array("i"), array("i")
+    with open(path) as file:
+        _read_rle_header(file)
+        for x, y, n in _rle_runs(file):
+            xs.append(x)
+            ys.append(y)
+            lengths.append(n)
+    return _expand_runs(xs, ys, lengths)
+
+
+def _life106_cells(lines):
+    """ Yields the (x, y) live cells of a Life 1.06 file. """
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            x, y = line.split()
+            yield int(x), int(y)
+
+
+def read_life106(path: str) -> np.ndarray:
+    """ Parses a Life 1.06 file into an (n, 2) int32 array, shifted so the minimum is (0, 0). """
+    coordinates = array("i")
+    with open(path) as file:
+        for x, y in _life106_cells(file):
+            coordinates.append(x)
+            coordinates.append(y)
+    cells = np.asarray(coordinates, dtype=np.int32).reshape(-1, 2)
+    if len(cells):
+        cells -= cells.min(axis=0)
+    return cells
+
+
+def read_pattern(path: str) -> np.ndarray:
+    """ Parses an .rle, .lif or .life file into an (n, 2) int32 array of live cells. """
+    if path.lower().endswith(".rle"):
+        return read_rle(path)
+    if path.lower().endswith((".lif", ".life")):
+        return read_life106(path)
+    raise ValueError(f"Unsupported pattern file '{path}', expected one of {', '.join(PATTERN_EXTENSIONS)}.")
+
+
+def read_pattern_info(path: str) -> PatternInfo:
+    """ Reads the name and bounding box of a pattern file without keeping its cells.
+
+    RLE files declare their size in the header. Life 1.06 files have no size line,
+    so their coordinates are streamed once to find the bounding box.
+    """
+    name = os.path.splitext(os.path.basename(path))[0].lower()
+    with open(path) as file:
+        if path.lower().endswith(".rle"):
+            width, height, rule = _read_rle_header(file)
+            return PatternInfo(name, path, width, height, rule)
+        min_x = min_y = max_x = max_y = None
+        for x, y in _life106_cells(file):
+            if min_x is None:
+                min_x = max_x = x
+                min_y = max_y = y
+            min_x, max_x = min(min_x, x), max(max_x, x)
+            min_y, max_y = min(min_y, y), max(max_y, y)
+    if min_x is None:
+        return PatternInfo(name, path, 0, 0, None)
+    return PatternInfo(name, path, max_x - min_x + 1, max_y - min_y + 1, None)
+
+
+class PatternLibrary:
+    """ A directory of pattern files, indexed by name and loaded on first use. """
+
+    def __init__(self, directory: str = PATTERN_DIR, max_cached: int = 64):
+        """ Initialize the library; the directory is only scanned when first needed. """
+        self.directory = directory
+        self.max_cached = max_cached
+        self._index = None
+        self._cache = OrderedDict()
+
+    @property
+    def index(self) -> dict:
+        """ Maps pattern names (file names without extension) to their PatternInfo. """
+        if self._index is None:
+            self.refresh()
+        return self._index
+
+    def refresh(self) -> None:
+        """ Rescans the directory and drops cached patterns. """
+        self._index = {}
+        self._cache.clear()
+        if not os.path.isdir(self.directory):
+            return
+        for file_name in sorted(os.listdir(self.directory)):
+            if file_name.lower().endswith(PATTERN_EXTENSIONS):
+                info = read_pattern_info(os.path.join(self.directory, file_name))
+                self._index[info.name] = info
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self.index
+
+    def names(self) -> list:
+        """ Returns the sorted pattern names. """
+        return sorted(self.index)
+
+    def info(self, name: str) -> PatternInfo:
+        """ Returns the PatternInfo of a pattern. """
+        try:
+            return self.index[name.lower()]
+        except KeyError:
+            raise KeyError(f"No pattern named '{name}' in {self.directory}.") from None
+
+    def find(self, max_width: int = None, max_height: int = None) -> list:
+        """ Returns the PatternInfo of every pattern whose bounding box fits in max_width x max_height. """
+        return [
+            info for info in self.index.values()
+            if (max_width is None or (info.width or 0) <= max_width)
+            and (max_height is None or (info.height or 0) <= max_height)
+        ]
+
+    def load(self, name: str) -> np.ndarray:
+        """ Returns the (n, 2) int32 live cells of a pattern, parsed once and then cached.
+
+        The returned array is read-only because it is shared between callers.
+        """
+        key = name.lower()
+        cells = self._cache.get(key)
+        if cells is not None:
+            self._cache.move_to_end(key)
+            return cells
+        cells = read_pattern(self.info(key).path)
+        cells.flags.writeable = False
+        self._cache[key] = cells
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return cells
@@ -0,0 +1,122 @@
+"""
+    Array-based renderer for the game of life.
+
+    Cells are turned into colours with one lookup into a palette, blitted as a small
+    (width x height) pixel array, scaled to the screen and covered with grid lines that
+    were drawn once. Only the rectangles of cells whose colour changed are sent to
+    pygame.display.update.
+"""
+import numpy as np
+import pygame
+
+HEATMAP_MAX_AGE = 100  # Age at which the heatmap hue stops changing
+FULL_UPDATE_RATIO = 0.25  # Above this share of changed cells, update the whole screen
+GRID_LINE_COLORKEY = (255, 0, 255)
+
+
+def hsv_to_rgb(hue: np.ndarray) -> np.ndarray:
+    """ Vectorized colorsys.hsv_to_rgb(hue, 1, 1), returning uint8 RGB rows. """
+    hue = np.asarray(hue, dtype=float)
+    sector = np.floor(hue * 6.0).astype(int) % 6
+    f = hue * 6.0 - np.floor(hue * 6.0)
+    one, zero, q, t = np.ones_like(f), np.zeros_like(f), 1.0 - f, f
+    rgb = np.select(
+        [sector[:, None] == i for i in range(6)],
+        [np.stack(channels, axis=1) for channels in
+         [(one, t, zero), (q, one, zero), (zero, one, t), (zero, q, one), (t, zero, one), (one, zero, q)]])
+    return (rgb * 255).astype(np.uint8)
+
+
+class GridRenderer:
+    """ Draws a board onto a pygame surface and tracks which cells changed colour. """
+
+    def __init__(self, color_scheme: dict, trail_length: int = 5):
+        """ Initialize the colour lookup tables. """
+        self.color_scheme = color_scheme
+        self.trail_length = trail_length
+        self._grid_lines = None
+        self._layout = None
+        self._previous = None
+        self._previous_mode = None
+        self._palettes = {}
+
+    def palette(self, mode: str) -> np.ndarray:
+        """ Returns the (n, 3) colour table of a mode, built once.
+
+        Index 0 is the background, index 1 the highlight colour and the remaining
+        rows are indexed by cell age for the heatmap and trails modes.
+        """
+        if mode not in self._palettes:
+            base = [self.color_scheme['background'], self.color_scheme['highlight']]
+            if mode == "heatmap":
+                ages = np.arange(HEATMAP_MAX_AGE + 1)
+                cells = hsv_to_rgb(ages / HEATMAP_MAX_AGE)
+            elif mode == "trails":
+                ages = np.arange(self.trail_length + 1)
+                fade = (self.trail_length - ages) / self.trail_length
+                cells = (np.array(self.color_scheme['cell'])[None, :] * fade[:, None]).astype(np.uint8)
+            else:
+                cells = np.array([self.color_scheme['cell']], dtype=np.uint8)
+            self._palettes[mode] = np.vstack([np.array(base, dtype=np.uint8), cells])
+        return self._palettes[mode]
+
+    def colour_indices(self, board: np.ndarray, age: np.ndarray, mode: str, highlight: np.ndarray = None) -> np.ndarray:
+        """ Maps every cell to a row of the mode's palette. """
+        if mode == "heatmap":
+            live = 2 + np.minimum(age, HEATMAP_MAX_AGE)
+        elif mode == "trails":
+            live = 2 + np.minimum(age, self.trail_length)
+        else:
+            live = 2
+        indices = np.where(board.view(bool), live, 0).astype(np.uint8)
+        if highlight is not None and mode == "classic":
+            indices[highlight & board.view(bool)] = 1
+        return indices
+
+    def _prepare(self, screen: pygame.Surface, dim: tuple) -> None:
+        """ Draws the grid lines once per screen size and board size. """
+        layout = (screen.get_size(), tuple(dim))
+        if layout == self._layout:
+            return
+        self._layout = layout
+        self._previous = None
+
+        width, height = screen.get_size()
+        cell_width, cell_height = width / dim[0], height / dim[1]
+        self._grid_lines = pygame.Surface((width, height))
+        self._grid_lines.fill(GRID_LINE_COLORKEY)
+        self._grid_lines.set_colorkey(GRID_LINE_COLORKEY)
+        for x in range(dim[0] + 1):
+            pygame.draw.line(self._grid_lines, self.color_scheme['grid'], (x * cell_width, 0), (x * cell_width, height))
+        for y in range(dim[1] + 1):
+            pygame.draw.line(self._grid_lines, self.color_scheme['grid'], (0, y * cell_height), (width, y * cell_height))
+
+    def draw(self, screen: pygame.Surface, board: np.ndarray, age: np.ndarray,
+             mode: str = "classic", highlight: np.ndarray = None) -> list:
+        """ Draws the board and returns the screen rectangles that changed. """
+        self._prepare(screen, board.shape)
+        indices = self.colour_indices(board, age, mode, highlight)
+
+        cells_surface = pygame.surfarray.make_surface(self.palette(mode)[indices])
+        screen.blit(pygame.transform.scale(cells_surface, screen.get_size()), (0, 0))
+        screen.blit(self._grid_lines, (0, 0))
+
+        previous, self._previous = self._previous, indices
+        previous_mode, self._previous_mode = self._previous_mode, mode
+        if previous is None or previous.shape != indices.shape or previous_mode != mode:
+            return [screen.get_rect()]
+
+        changed_x, changed_y = np.nonzero(indices != previous)
+        if len(changed_x) > FULL_UPDATE_RATIO * indices.size:
+            return [screen.get_rect()]
+
+        cell_width = screen.get_width() / board.shape[0]
+        cell_height = screen.get_height() / board.shape[1]
+        return [
+            pygame.Rect(int(x * cell_width), int(y * cell_height), int(cell_width) + 2, int(cell_height) + 2)
+            for x, y in zip(changed_x.tolist(), changed_y.tolist())
+        ]
+
+    def invalidate(self) -> None:
+        """ Forces the next draw to update the whole screen. """
+        self._previous = None
@@ -0,0 +1,72 @@
+"""
+    Life-like cellular automaton rules in B/S notation.
+
+    A rule such as "B36/S23" lists the neighbour counts for which a dead cell is
+    born (B) and a live cell survives (S). Each rule is compiled once into a 2x9
+    lookup table indexed by [alive, neighbours], so the engine applies any rule
+    with a single table lookup over the neighbour-count array.
+"""
+import re
+
+import numpy as np
+
+_BS_NOTATION = re.compile(r"^B(?P<birth>[0-8]*)/S(?P<survival>[0-8]*)$", re.IGNORECASE)
+_SB_NOTATION = re.compile(r"^(?P<survival>[0-8]*)/(?P<birth>[0-8]*)$")
+
+
+class Rule:
+    """ A Life-like rule: the neighbour counts for birth and for survival. """
+
+    def __init__(self, birth, survival, name: str = None):
+        """ Initialize the rule and compile its lookup table. """
+        self.birth = frozenset(int(n) for n in birth)
+        self.survival = frozenset(int(n) for n in survival)
+        if not self.birth | self.survival <= set(range(9)):
+            raise ValueError("Neighbour counts must be between 0 and 8.")
+        self.name = name or self.notation
+        self.lut = np.zeros((2, 9), dtype=bool)
+        self.lut[0, sorted(self.birth)] = True
+        self.lut[1, sorted(self.survival)] = True
+        self.lut.flags.writeable = False
+
+    @classmethod
+    def parse(cls, text: str) -> "Rule":
+        """ Builds a rule from a name in RULES, B/S notation ("B36/S23") or S/B notation ("23/36"). """
+        key = text.strip().lower().replace(" ", "").replace("-", "").replace("&", "")
+        if key in RULES:
+            return RULES[key]
+        match = _BS_NOTATION.match(text.strip()) or _SB_NOTATION.match(text.strip())
+        if not match:
+            raise ValueError(f"Cannot parse rule '{text}', expected B/S notation such as 'B3/S23'.")
+        return cls(match.group("birth"), match.group("survival"))
+
+    @property
+    def notation(self) -> str:
+        """ The rule in B/S notation. """
+        return "B" + "".join(map(str, sorted(self.birth))) + "/S" + "".join(map(str, sorted(self.survival)))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Rule) and (self.birth, self.survival) == (other.birth, other.survival)
+
+    def __hash__(self) -> int:
+        return hash((self.birth, self.survival))
+
+    def __repr__(self) -> str:
+        return f"Rule('{self.notation}')"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+LIFE = Rule("3", "23", "Life")
+
+RULES = {
+    "life": LIFE,
+    "highlife": Rule("36", "23", "HighLife"),
+    "seeds": Rule("2", "", "Seeds"),
+    "daynight": Rule("3678", "34678", "Day & Night"),
+    "lifewithoutdeath": Rule("3", "012345678", "Life without Death"),
+    "replicator": Rule("1357", "1357", "Replicator"),
+    "2x2": Rule("36", "125", "2x2"),
+    "maze": Rule("3", "12345", "Maze"),
+}
@@ -0,0 +1,176 @@
+"""
+    Background simulation loop for the game of life.
+
+    The worker thread owns the engine and steps it on a fixed-step schedule at the
+    configured number of generations per second. After each batch it publishes the
+    board to a double buffer, which the render loop reads at its own frame rate.
+    Generations produced between two frames are never drawn, but every generation
+    is recorded in a History so the session can be rewound and saved, and in
+    Metrics for the population and activity time series.
+"""
+import queue
+import threading
+import time
+import traceback
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+from history import History
+from instrumentation import Metrics
+from life_engine import MAX_AGE, LifeEngine, age_dtype
+from rules import LIFE, Rule
+from template_grid import Grid
+
+Frame = namedtuple("Frame", ["board", "age", "generation"])
+
+MAX_BATCH_SECONDS = 1 / 120  # Longest stretch of stepping between two publications
+
+
+class FrameBuffer:
+    """ Double buffer handing boards from the simulation thread to the renderer. """
+
+    def __init__(self, width: int, height: int, age_type=age_dtype(MAX_AGE)):
+        """ Initialize the front and back frames. """
+        self._front = self._new_frame((width, height), age_type)
+        self._back = self._new_frame((width, height), age_type)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _new_frame(shape: tuple, age_type) -> Frame:
+        return Frame(np.zeros(shape, dtype=np.uint8), np.zeros(shape, dtype=age_type), [0])
+
+    def publish(self, board: np.ndarray, age: np.ndarray, generation: int, wait: bool = False) -> bool:
+        """ Copies a board into the back frame and swaps it to the front.
+
+        Without wait, returns False at once if the renderer is reading the front frame;
+        the simulation then keeps stepping and publishes a later generation instead.
+        """
+        if not self._lock.acquire(blocking=wait):
+            return False
+        try:
+            if self._back.board.shape != board.shape or self._back.age.dtype != age.dtype:
+                self._back = self._new_frame(board.shape, age.dtype)
+            np.copyto(self._back.board, board)
+            np.copyto(self._back.age, age)
+            self._back.generation[0] = generation
+            self._front, self._back = self._back, self._front
+        finally:
+            self._lock.release()
+        return True
+
+    @contextmanager
+    def read(self):
+        """ Yields the front frame (board, age, generation), locked while in use. """
+        with self._lock:
+            yield Frame(self._front.board, self._front.age, self._front.generation[0])
+
+
+class SimulationWorker(threading.Thread):
+    """ Steps a LifeEngine in the background at a fixed number of generations per second. """
+
+    def __init__(self, grid: Grid, speed: float = 10, rule: Rule = LIFE, wrap: bool = True):
+        """ Initialize the worker from a starting Grid; call start() to run it. """
+        super().__init__(daemon=True)
+        self.engine = LifeEngine.from_grid(grid, rule=rule, wrap=wrap)
+        self.speed = speed  # generations per second
+        self.paused = False
+        self.frames = FrameBuffer(grid.dim.width, grid.dim.height, self.engine.age.dtype)
+        self.history = History(grid.dim.width, grid.dim.height)
+        self.history.record(self.engine.board, self.engine.generation)
+        self.metrics = Metrics()
+        self.metrics.record(self.engine.board, self.engine.generation)
+        self._edits = queue.Queue()
+        self.last_error = None  # Message of the latest edit that raised, for the window to show
+        self._stop_event = threading.Event()
+        self._publish(wait=True)
+
+    def _publish(self, wait: bool = False) -> bool:
+        return self.frames.publish(self.engine.board, self.engine.age, self.engine.generation, wait)
+
+    def edit(self, function) -> None:
+        """ Queues function(engine) to run on the simulation thread between two steps. """
+        self._edits.put(function)
+
+    def rewind(self, generations: int) -> None:
+        """ Moves the board back (or forward, if negative) through the recorded history.
+
+        The target is clamped to the recorded generations. Cell ages are not
+        recorded and restart from 0. Stepping on from an earlier generation keeps
+        the newer ones; editing it drops them.
+        """
+        def seek(engine):
+            history = self.history
+            target = min(max(engine.generation - generations, history.first), history.last)
+            if target not in history:
+                return
+            engine.board = history.seek(target)
+            engine.age[...] = 0
+            engine.generation = target
+        self.edit(seek)
+
+    def load_history(self, history: History) -> None:
+        """ Replaces the history, e.g. with a session read by History.load, and shows its newest generation. """
+        def replace(engine):
+            self.history = history
+            engine.board = history.seek(history.last)
+            engine.age[...] = 0
+            engine.generation = history.last
+        self.edit(replace)
+
+    def stop(self) -> None:
+        """ Asks the worker to finish its current batch and exit. """
+        self._stop_event.set()
+
+    def _apply_edits(self) -> bool:
+        """ Runs the queued edits and returns True if there were any.
+
+        An edit that raises is reported on stderr and in last_error, and the loop keeps running.
+        """
+        edited = False
+        while True:
+            try:
+                function = self._edits.get_nowait()
+            except queue.Empty:
+                return edited
+            try:
+                function(self.engine)
+            except Exception as error:
+                traceback.print_exc()
+                self.last_error = f"{type(error).__name__}: {error}"
+            edited = True  # A failed edit may have changed the board before raising
+
+    def run(self) -> None:
+        """ Fixed-step loop: owes speed generations per second and pays them in batches. """
+        last_time = time.perf_counter()
+        owed = 0.0
+        published = True
+        while not self._stop_event.is_set():
+            if self._apply_edits():
+                self.history.record(self.engine.board, self.engine.generation)
+                self.metrics.record(self.engine.board, self.engine.generation)
+                published = self._publish(wait=True)
+
+            now = time.perf_counter()
+            if self.paused:
+                owed = 0.0
+            else:
+                owed = min(owed + (now - last_time) * self.speed, self.speed * MAX_BATCH_SECONDS * 4 + 1)
+            last_time = now
+
+            if owed < 1:
+                if not published:
+                    published = self._publish()
+                # Sleep until the next generation is due, waking often enough for edits
+                time.sleep(min(1 / max(self.speed, 1), 0.005) if not self.paused else 0.005)
+                continue
+
+            batch_end = now + MAX_BATCH_SECONDS
+            while owed >= 1 and time.perf_counter() < batch_end:
+                step_start = time.perf_counter()
+                self.engine.step()
+                self.metrics.record(self.engine.board, self.engine.generation, time.perf_counter() - step_start)
+                self.history.record(self.engine.board, self.engine.generation)
+                owed -= 1
+            published = self._publish()
@@ -20,6 +20,7 @@ NAIVE_ACCEPT_CHANCE = 1.0  # Always accepts
 ADAPT_INITIAL_ACCEPT_CHANCE = 0.8
 ADAPT_PENALTY = 0.1  # Reduces accept chance after being scammed
 BAD_SCAM_CHANCE = 0.7
+SCAMMED_BY_MEMORY = 16  # Number of recent scammers each player remembers
 
 # Visualization
 COLORS = {
@@ -32,6 +33,7 @@ COLORS = {
 WINDOW_SIZE = "1000x800"
 CHART_UPDATE_INTERVAL = 10  # Update charts every 10 rounds
 STATS_UPDATE_INTERVAL = 1   # Update text stats every round
+GUI_POLL_INTERVAL = 50  # Milliseconds between two checks for new results
 
 # Performance
 SIMULATION_SPEED = 0.01  # Delay between rounds in seconds
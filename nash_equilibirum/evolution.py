@@ -0,0 +1,41 @@
+"""Selection and mutation shared by the object and array game engines"""
+import numpy as np
+
+
+def top_indices(scores, count):
+    """
+    Return the positions of the count highest scores, in no particular order, in O(n).
+    """
+    size = len(scores)
+    if count <= 0:
+        return np.empty(0, dtype=np.intp)
+    if count >= size:
+        return np.arange(size)
+    return np.argpartition(scores, size - count)[size - count:]
+
+
+def select(scores, elimination_count, reproduction_count, parent_pool, rng):
+    """
+    Pick the survivors and the parents of the children of one round.
+
+    The elimination_count lowest scorers are dropped. Each of the reproduction_count
+    children gets a parent drawn from the parent_pool best scorers with probability
+    proportional to its score (uniformly if they all scored 0). Returns two index arrays.
+    """
+    survivors = top_indices(scores, len(scores) - elimination_count)
+    pool = top_indices(scores, parent_pool)
+    if not reproduction_count or not len(pool):
+        return survivors, np.empty(0, dtype=np.intp)
+
+    weights = np.maximum(scores[pool], 0).astype(np.float64)
+    total = weights.sum()
+    parents = rng.choice(pool, size=reproduction_count, p=weights / total if total > 0 else None)
+    return survivors, parents
+
+
+def mutate(size, mutation_rate, type_count, rng):
+    """
+    Pick the players that mutate this round and their new type codes.
+    """
+    mutants = np.flatnonzero(rng.random(size) < mutation_rate)
+    return mutants, rng.integers(type_count, size=len(mutants))
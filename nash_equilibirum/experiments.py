@@ -0,0 +1,164 @@
+"""Monte Carlo batch experiments over grids of game parameters"""
+import argparse
+import csv
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from config import *
+from population import PARAMETERS, Population
+
+CONFIDENCE_Z = 1.96  # 95% normal confidence interval; fine for the hundreds of replicates an experiment runs
+ROUND_COLUMNS = ["round"] + [f"{player_type}_count" for player_type in PLAYER_TYPES] \
+    + [f"{player_type}_average_score" for player_type in PLAYER_TYPES] + ["total_players"]
+INTEGER_COLUMNS = [not column.endswith("_average_score") for column in ROUND_COLUMNS]
+
+
+def parameter_grid(grid):
+    """
+    Expand a dictionary of parameter name -> list of values into one dictionary per combination.
+    """
+    for name in grid:
+        if name not in PARAMETERS:
+            raise KeyError(f"Unknown parameter: {name}. Choose from {', '.join(PARAMETERS)}")
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_replicate(parameters, population_size, num_rounds, seed):
+    """
+    Play one seeded game with the given parameters and return its per-round aggregates.
+    Each row holds the round number, the count and average score of every type, and the population size.
+    """
+    game = Population(population_size=population_size, seed=seed, parameters=parameters)
+    rows = np.zeros((num_rounds, len(ROUND_COLUMNS)))
+    for round_index in range(num_rounds):
+        game.run_round()
+        results = game.get_results()
+        rows[round_index, 0] = game.round_number
+        for index, player_type in enumerate(PLAYER_TYPES):
+            rows[round_index, 1 + index] = results[player_type]["count"]
+            rows[round_index, 1 + len(PLAYER_TYPES) + index] = results[player_type]["average_score"]
+        rows[round_index, -1] = len(game)
+    return rows
+
+
+def _run_task(task):
+    point, replicate, parameters, population_size, num_rounds, seed = task
+    return point, replicate, run_replicate(parameters, population_size, num_rounds, seed)
+
+
+def summarize(values, low=-math.inf, high=math.inf):
+    """
+    Return the mean, standard deviation and 95% confidence interval of the mean of a set of replicates.
+    The interval is clipped to [low, high], e.g. [0, 1] for shares.
+    """
+    values = np.asarray(values, dtype=float)
+    mean = values.mean()
+    std = values.std(ddof=1) if len(values) > 1 else 0.0
+    margin = CONFIDENCE_Z * std / math.sqrt(len(values))
+    return {"mean": mean, "std": std, "ci_low": max(mean - margin, low), "ci_high": min(mean + margin, high)}
+
+
+def run_experiment(grid, replicates=100, population_size=INITIAL_POPULATION_SIZE, num_rounds=100,
+                   seed=0, workers=None, rounds_path="rounds.csv"):
+    """
+    Run every parameter combination of the grid replicates times across a process pool.
+
+    Per-round aggregates are appended to rounds_path as each replicate finishes.
+    Returns one summary row per combination, with the confidence interval of each
+    type's final share of the population and final average score.
+    """
+    points = parameter_grid(grid)
+    names = list(grid)
+    # Every replicate gets its own independent stream, reproducible from the experiment seed
+    seeds = np.random.SeedSequence(seed).spawn(len(points) * replicates)
+    tasks = [(point, replicate, parameters, population_size, num_rounds, seeds[point * replicates + replicate])
+             for point, parameters in enumerate(points) for replicate in range(replicates)]
+
+    finals = [[] for _ in points]
+    with open(rounds_path, "w", newline="") as file, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.writer(file)
+        writer.writerow(["point", "replicate"] + names + ROUND_COLUMNS)
+        futures = [pool.submit(_run_task, task) for task in tasks]
+        for future in as_completed(futures):
+            point, replicate, rows = future.result()
+            values = [points[point][name] for name in names]
+            writer.writerows([point, replicate] + values
+                             + [int(value) if integer else value for value, integer in zip(row, INTEGER_COLUMNS)]
+                             for row in rows.tolist())
+            file.flush()
+            finals[point].append(rows[-1])
+
+    summary = []
+    for point, parameters in enumerate(points):
+        final = np.array(finals[point])
+        total = np.maximum(final[:, -1], 1)
+        row = dict(parameters)
+        for index, player_type in enumerate(PLAYER_TYPES):
+            for statistic, value in summarize(final[:, 1 + index] / total, 0.0, 1.0).items():
+                row[f"{player_type}_share_{statistic}"] = value
+            for statistic, value in summarize(final[:, 1 + len(PLAYER_TYPES) + index]).items():
+                row[f"{player_type}_score_{statistic}"] = value
+        summary.append(row)
+    return summary
+
+
+def write_summary(summary, path):
+    """
+    Write the summary rows of run_experiment to a CSV file.
+    """
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(summary[0]))
+        writer.writeheader()
+        writer.writerows(summary)
+
+
+def parse_parameter(text):
+    """
+    Parse 'NAME=value1,value2,...' into a name and a list of numbers; whole numbers stay ints, like the scores.
+    """
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"Expected NAME=value1,value2,... but got {text}")
+    return name.upper(), [int(value) if value.lstrip("-").isdigit() else float(value) for value in values.split(",")]
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Run replicated trade games over a grid of parameters.")
+    parser.add_argument("-p", "--param", type=parse_parameter, action="append", default=[],
+                        help="parameter and values to try, e.g. BAD_SCAM_CHANCE=0.5,0.7,0.9 (repeatable)")
+    parser.add_argument("-r", "--replicates", type=int, default=100)
+    parser.add_argument("-n", "--rounds", type=int, default=100)
+    parser.add_argument("--population", type=int, default=INITIAL_POPULATION_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--rounds-file", default="rounds.csv", help="where to stream the per-round aggregates")
+    parser.add_argument("--summary-file", default="summary.csv")
+    args = parser.parse_args(argv)
+
+    grid = dict(args.param)
+    try:
+        summary = run_experiment(grid, args.replicates, args.population, args.rounds, args.seed, args.workers,
+                                 args.rounds_file)
+    except KeyError as e:
+        parser.error(e.args[0])
+    write_summary(summary, args.summary_file)
+
+    for row in summary:
+        print(", ".join(f"{name} = {row[name]}" for name in grid) or "Default parameters")
+        for player_type in PLAYER_TYPES:
+            print(f"  {player_type}: share {row[f'{player_type}_share_mean']:.3f} "
+                  f"[{row[f'{player_type}_share_ci_low']:.3f}, {row[f'{player_type}_share_ci_high']:.3f}], "
+                  f"average score {row[f'{player_type}_score_mean']:.2f} "
+                  f"[{row[f'{player_type}_score_ci_low']:.2f}, {row[f'{player_type}_score_ci_high']:.2f}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Incremental per-type statistics and per-round snapshots of a game"""
+import numpy as np
+
+from config import *
+
+COUNTERS = ("score", "trades_made", "successful_trades", "times_scammed", "times_scammed_others")
+AVERAGE_KEYS = {
+    "trades_made": "avg_trades",
+    "successful_trades": "avg_successful_trades",
+    "times_scammed": "avg_times_scammed",
+    "times_scammed_others": "avg_times_scammed_others",
+}
+TYPE_INDEX = {player_type: index for index, player_type in enumerate(PLAYER_TYPES)}
+
+
+class StatsAccumulator:
+    """This class keeps per-type player counts and counter totals up to date as trades and evolution happen"""
+    def __init__(self):
+        """
+        Start with no players.
+        Plain lists are used because every update touches a single value.
+        """
+        self.counts = [0] * len(PLAYER_TYPES)
+        self.totals = {name: [0] * len(PLAYER_TYPES) for name in COUNTERS}
+
+    def add_player(self, player):
+        """
+        Count a player that joins the population, with its current counters.
+        """
+        index = TYPE_INDEX[player.player_type]
+        self.counts[index] += 1
+        for name in COUNTERS:
+            self.totals[name][index] += getattr(player, name)
+
+    def remove_player(self, player):
+        """
+        Stop counting a player that leaves the population (or is about to change type).
+        """
+        index = TYPE_INDEX[player.player_type]
+        self.counts[index] -= 1
+        for name in COUNTERS:
+            self.totals[name][index] -= getattr(player, name)
+
+    def record_trade(self, player, points):
+        """
+        Mirror Player.update_score.
+        """
+        index = TYPE_INDEX[player.player_type]
+        self.totals["score"][index] += points
+        self.totals["trades_made"][index] += 1
+        if points > 0:
+            self.totals["successful_trades"][index] += 1
+
+    def record_scam(self, scammer, victim):
+        """
+        Mirror Player.scam_other and Player.get_scammed.
+        """
+        self.totals["times_scammed_others"][TYPE_INDEX[scammer.player_type]] += 1
+        self.totals["times_scammed"][TYPE_INDEX[victim.player_type]] += 1
+
+    def get_results(self):
+        """
+        Return the count, total score and average score of every type, as Settings.get_results
+        """
+        results = {}
+        for index, player_type in enumerate(PLAYER_TYPES):
+            count, total_score = self.counts[index], self.totals["score"][index]
+            results[player_type] = {
+                "count": count,
+                "total_score": total_score,
+                "average_score": total_score / count if count > 0 else 0,
+            }
+        return results
+
+    def get_detailed_stats(self):
+        """
+        Add the average counters of every type to get_results, as Settings.get_detailed_stats
+        """
+        stats = self.get_results()
+        for index, player_type in enumerate(PLAYER_TYPES):
+            if self.counts[index]:
+                for name, key in AVERAGE_KEYS.items():
+                    stats[player_type][key] = self.totals[name][index] / self.counts[index]
+        return stats
+
+
+class RoundHistory:
+    """This class stores one snapshot of the per-type statistics per round, one column per value"""
+    def __init__(self, capacity=DEFAULT_ROUNDS):
+        """
+        Preallocate room for capacity rounds; the buffer doubles when it is full.
+        """
+        self.columns = ["round"] + [f"{player_type}_{name}" for player_type in PLAYER_TYPES
+                                    for name in ("count",) + COUNTERS]
+        self._data = np.zeros((capacity, len(self.columns)), dtype=np.int64)
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def append(self, round_number, stats):
+        """
+        Record the statistics of a StatsAccumulator at the end of a round.
+        """
+        if self._length == len(self._data):
+            self._data = np.concatenate([self._data, np.zeros_like(self._data)])
+        row = [round_number]
+        for index in range(len(PLAYER_TYPES)):
+            row.append(stats.counts[index])
+            row.extend(stats.totals[name][index] for name in COUNTERS)
+        self._data[self._length] = row
+        self._length += 1
+
+    def column(self, name):
+        """
+        Return one recorded column as an array, e.g. column("BAD_count").
+        """
+        return self._data[:self._length, self.columns.index(name)]
+
+    def results_at(self, index):
+        """
+        Return the round number and the results, in the format of Settings.get_results, of one snapshot.
+        """
+        row = self._data[index]
+        results = {}
+        for type_index, player_type in enumerate(PLAYER_TYPES):
+            start = 1 + type_index * (1 + len(COUNTERS))
+            count, total_score = int(row[start]), int(row[start + 1])
+            results[player_type] = {
+                "count": count,
+                "total_score": total_score,
+                "average_score": total_score / count if count > 0 else 0,
+            }
+        return int(row[0]), results
+
+    def replay(self, step=1):
+        """
+        Yield (round_number, results) for every step-th recorded round, and always the last one.
+        """
+        for index in range(0, self._length, step):
+            yield self.results_at(index)
+        if self._length and (self._length - 1) % step:
+            yield self.results_at(self._length - 1)
+
+    def to_csv(self, path):
+        """
+        Write the recorded rounds to a CSV file with a header line.
+        """
+        np.savetxt(path, self._data[:self._length], fmt="%d", delimiter=",", header=",".join(self.columns),
+                   comments="")
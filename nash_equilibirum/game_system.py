@@ -1,9 +1,13 @@
+import queue
 import tkinter as tk
 from tkinter import ttk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from config import *
 from settings import Settings
-import time
+from simulation import SimulationWorker
+
+HISTORY_FILE = "round_history.csv"
 
 class GameSystem:
     def __init__(self, master):
@@ -13,6 +17,8 @@ class GameSystem:
 
         self.settings = Settings(population_size=100)
         self.is_running = False
+        self.worker = None
+        self.last_chart_round = 0
 
         self.create_widgets()
 
@@ -48,8 +54,23 @@ class GameSystem:
         self.stop_button = ttk.Button(self.control_frame, text="Stop Game", command=self.stop_game, state=tk.DISABLED)
         self.stop_button.pack(side=tk.LEFT, padx=5)
 
+        self.replay_button = ttk.Button(self.control_frame, text="Replay", command=self.replay_game, state=tk.DISABLED)
+        self.replay_button.pack(side=tk.LEFT, padx=5)
+
+        self.export_button = ttk.Button(self.control_frame, text="Export", command=self.export_history,
+                                        state=tk.DISABLED)
+        self.export_button.pack(side=tk.LEFT, padx=5)
+
         # Visual widgets
         self.figure, (self.ax1, self.ax2) = plt.subplots(2, 1, figsize=(10, 8))
+        # The bars are created once and their heights updated in place
+        colors = [COLORS[player_type] for player_type in PLAYER_TYPES]
+        self.count_bars = self.ax1.bar(PLAYER_TYPES, [0] * len(PLAYER_TYPES), color=colors)
+        self.ax1.set_title("Player Type Distribution")
+        self.ax1.set_ylabel("Number of Players")
+        self.score_bars = self.ax2.bar(PLAYER_TYPES, [0] * len(PLAYER_TYPES), color=colors)
+        self.ax2.set_title("Average Scores by Player Type")
+        self.ax2.set_ylabel("Average Score")
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.visual_frame)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(expand=True, fill=tk.BOTH)
@@ -68,49 +89,89 @@ class GameSystem:
         self.is_running = True
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
+        self.replay_button.config(state=tk.DISABLED)
+        self.export_button.config(state=tk.DISABLED)
         
-        self.run_game(num_rounds)
+        # The game runs on its own thread; the Tk loop only polls for its results
+        self.worker = SimulationWorker(self.settings, num_rounds)
+        self.last_chart_round = 0
+        self.worker.start()
+        self.master.after(GUI_POLL_INTERVAL, self.poll_results, self.worker)
 
     def stop_game(self):
         self.is_running = False
+        if self.worker is not None:
+            self.worker.stop()
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
 
-    def run_game(self, num_rounds):
-        for round in range(num_rounds):
-            if not self.is_running:
-                break
-            
-            self.settings.run_game(1)
-            results = self.settings.get_results()
-            
-            self.update_visuals(results)
-            self.update_stats(results, round + 1)
-            
-            self.master.update()
-            time.sleep(0.01)  # Small delay to make the visualization smoother
-        
+    def finish_game(self):
         self.stop_game()
+        # The worker has finished, so its history can be read from this thread
+        if len(self.settings.history):
+            self.replay_button.config(state=tk.NORMAL)
+            self.export_button.config(state=tk.NORMAL)
+
+    def replay_game(self):
+        """
+        Play the recorded rounds back through the charts, one chart update at a time.
+        """
+        self.start_button.config(state=tk.DISABLED)
+        self.replay_button.config(state=tk.DISABLED)
+        self.replay_step(self.settings.history.replay(CHART_UPDATE_INTERVAL))
+
+    def replay_step(self, snapshots):
+        snapshot = next(snapshots, None)
+        if snapshot is None:
+            self.start_button.config(state=tk.NORMAL)
+            self.replay_button.config(state=tk.NORMAL)
+            return
+        round_num, results = snapshot
+        self.update_stats(results, round_num)
+        self.update_visuals(results)
+        self.master.after(GUI_POLL_INTERVAL, self.replay_step, snapshots)
+
+    def export_history(self):
+        self.settings.history.to_csv(HISTORY_FILE)
+
+    def poll_results(self, worker):
+        """
+        Show the latest results published by the worker, and poll again until it has finished.
+        """
+        latest = None
+        finished = False
+        while True:
+            try:
+                item = worker.results.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                finished = True
+            else:
+                latest = item
+
+        if latest is not None and worker is self.worker:
+            round_num, results = latest
+            self.update_stats(results, round_num)
+            if finished or round_num - self.last_chart_round >= CHART_UPDATE_INTERVAL:
+                self.update_visuals(results)
+                self.last_chart_round = round_num
+
+        if not finished:
+            self.master.after(GUI_POLL_INTERVAL, self.poll_results, worker)
+        elif worker is self.worker:
+            self.finish_game()
 
     def update_visuals(self, results):
-        # Clear previous plots
-        self.ax1.clear()
-        self.ax2.clear()
-
-        # Plot player distribution
-        player_types = list(results.keys())
-        counts = [results[pt]['count'] for pt in player_types]
-        self.ax1.bar(player_types, counts)
-        self.ax1.set_title("Player Type Distribution")
-        self.ax1.set_ylabel("Number of Players")
-
-        # Plot average scores
-        avg_scores = [results[pt]['average_score'] for pt in player_types]
-        self.ax2.bar(player_types, avg_scores)
-        self.ax2.set_title("Average Scores by Player Type")
-        self.ax2.set_ylabel("Average Score")
-
-        self.canvas.draw()
+        # Update the existing bars rather than redrawing the axes
+        counts = [results[pt]['count'] for pt in PLAYER_TYPES]
+        avg_scores = [results[pt]['average_score'] for pt in PLAYER_TYPES]
+        for axis, bars, values in ((self.ax1, self.count_bars, counts), (self.ax2, self.score_bars, avg_scores)):
+            for bar, value in zip(bars, values):
+                bar.set_height(value)
+            axis.set_ylim(0, max(max(values) * 1.1, 1))
+
+        self.canvas.draw_idle()
 
     def update_stats(self, results, round_num):
         stats_text = f"Round: {round_num}\n"
@@ -1,22 +1,52 @@
 from config import *
 from config import ADAPT_INITIAL_ACCEPT_CHANCE, ADAPT_PENALTY
+from collections import deque
+from itertools import count
 import random
 import unittest
 
+# Players are remembered by id, so a scammer's object can be freed once it is eliminated
+_player_ids = count()
+
 
 class Player:
+    __slots__ = ("player_id", "player_type", "score", "trades_made", "successful_trades", "times_scammed",
+                 "times_scammed_others", "scammed_by", "trust_level")
+
     def __init__(self, player_type):
+        self.player_id = next(_player_ids)
         self.player_type = player_type
         self.score = 0
         self.trades_made = 0
         self.successful_trades = 0
         self.times_scammed = 0
         self.times_scammed_others = 0
-        self.scammed_by = set()
+        # Only the most recent scammers are remembered, so memory stays constant over long games
+        self.scammed_by = deque(maxlen=SCAMMED_BY_MEMORY)
+        # Kept by every player so that one mutating into ADAPT has a trust level to start from
+        self.trust_level = ADAPT_INITIAL_ACCEPT_CHANCE
 
-    def decide_to_trade(self, other_player):
+    def decide_to_trade(self, other_player, rng=random):
+        """
+        Return True if this player agrees to trade with other_player.
+        rng is a random.Random, such as Settings.random for seeded games, or the random module.
+        """
         raise NotImplementedError("Subclass must implement abstract method")
 
+    def set_type(self, player_type):
+        """
+        Switch this player to another type, keeping its score and counters.
+        """
+        self.__class__ = PLAYER_CLASSES[player_type]
+        self.player_type = player_type
+
+    def reset(self, player_type):
+        """
+        Turn this player into a fresh player of the given type, reusing the object.
+        """
+        self.set_type(player_type)
+        self.__init__()
+
     def update_score(self, points):
         self.score += points
         self.trades_made += 1
@@ -25,7 +55,7 @@ class Player:
 
     def get_scammed(self, other_player):
         self.times_scammed += 1
-        self.scammed_by.add(other_player)
+        self.scammed_by.append(other_player.player_id)
 
     def scam_other(self):
         self.times_scammed_others += 1
@@ -41,21 +71,24 @@ class Player:
         }
 
 class NaivePlayer(Player):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("NAIVE")
 
-    def decide_to_trade(self, other_player):
-        return random.random() < NAIVE_ACCEPT_CHANCE
+    def decide_to_trade(self, other_player, rng=random):
+        return rng.random() < NAIVE_ACCEPT_CHANCE
 
 
 
 class AdaptPlayer(Player):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("ADAPT")
-        self.trust_level = ADAPT_INITIAL_ACCEPT_CHANCE
 
-    def decide_to_trade(self, other_player):
-        return random.random() < self.trust_level
+    def decide_to_trade(self, other_player, rng=random):
+        return rng.random() < self.trust_level
 
     def get_scammed(self, other_player):
         super().get_scammed(other_player)
@@ -64,28 +97,38 @@ class AdaptPlayer(Player):
 
 
 class BadPlayer(Player):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("BAD")
 
-    def decide_to_trade(self, other_player):
+    def decide_to_trade(self, other_player, rng=random):
         return True  # Always agrees to trade
 
-    def scam_attempt(self):
-        return random.random() < BAD_SCAM_CHANCE
+    def scam_attempt(self, rng=random):
+        """
+        Return True if this player scams its trade partner, drawing from rng as decide_to_trade.
+        """
+        return rng.random() < BAD_SCAM_CHANCE
+
+PLAYER_CLASSES = {
+    "NAIVE": NaivePlayer,
+    "ADAPT": AdaptPlayer,
+    "BAD": BadPlayer
+}
 
 def create_player(player_type):
-    if player_type == "NAIVE":
-        return NaivePlayer()
-    elif player_type == "ADAPT":
-        return AdaptPlayer()
-    elif player_type == "BAD":
-        return BadPlayer()
-    else:
+    if player_type not in PLAYER_CLASSES:
         raise ValueError(f"Unknown player type: {player_type}")
+    return PLAYER_CLASSES[player_type]()
 
-def create_initial_population(population_size):
+def create_initial_population(population_size, rng=random):
+    """
+    Create population_size players with types drawn from INITIAL_TYPE_DISTRIBUTION.
+    rng is a random.Random, such as Settings.random for seeded games, or the random module.
+    """
     population = []
     for _ in range(population_size):
-        player_type = random.choices(PLAYER_TYPES, weights=list(INITIAL_TYPE_DISTRIBUTION.values()))[0]
+        player_type = rng.choices(PLAYER_TYPES, weights=list(INITIAL_TYPE_DISTRIBUTION.values()))[0]
         population.append(create_player(player_type))
     return population
\ No newline at end of file
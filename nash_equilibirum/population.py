@@ -0,0 +1,204 @@
+"""Vectorized population engine for large trade games"""
+import time
+
+import numpy as np
+
+import config
+from config import *
+from evolution import mutate, select
+
+# Player types are stored as their index in PLAYER_TYPES
+NAIVE, ADAPT, BAD = (PLAYER_TYPES.index(player_type) for player_type in ("NAIVE", "ADAPT", "BAD"))
+PLAYER_FIELDS = ("player_type", "score", "trades_made", "successful_trades", "times_scammed",
+                 "times_scammed_others", "trust_level")
+# config.py parameters a Population can override, e.g. for experiments
+PARAMETERS = (
+    "NAIVE_ACCEPT_CHANCE", "ADAPT_INITIAL_ACCEPT_CHANCE", "ADAPT_PENALTY", "BAD_SCAM_CHANCE",
+    "COOPERATE_SCORE", "DEFECT_SCORE", "NO_TRADE_SCORE",
+    "MUTATION_RATE", "REPRODUCTION_RATE", "ELIMINATION_THRESHOLD",
+)
+
+
+def _new_players(player_type, trust_level):
+    """
+    Return the arrays of fresh players of the given types and initial trust level, keyed by attribute name.
+    """
+    size = len(player_type)
+    players = {name: np.zeros(size, dtype=np.int64) for name in PLAYER_FIELDS[1:-1]}
+    players["player_type"] = np.asarray(player_type, dtype=np.int8)
+    # Every player carries a trust level, so a player mutating into ADAPT has one, as after a class swap
+    players["trust_level"] = np.full(size, trust_level, dtype=np.float64)
+    return players
+
+
+class Population:
+    """This class plays the trade game on a population stored as NumPy arrays, one array per player attribute"""
+    def __init__(self, population_size=INITIAL_POPULATION_SIZE, seed=None, parameters=None):
+        """
+        Initialize the population arrays and the random generator.
+        parameters maps names from PARAMETERS to values used instead of the config.py ones.
+        """
+        unknown = set(parameters or ()) - set(PARAMETERS)
+        if unknown:
+            raise KeyError(f"Unknown parameter: {', '.join(sorted(unknown))}. Choose from {', '.join(PARAMETERS)}")
+        self.parameters = {name: getattr(config, name) for name in PARAMETERS}
+        self.parameters.update(parameters or {})
+        self.population_size = population_size
+        self.rng = np.random.default_rng(seed)
+        self.round_number = 0
+        self.initialize_population()
+
+    def initialize_population(self):
+        """
+        Draw the player types with the initial type distribution and reset every counter.
+        """
+        weights = np.array([INITIAL_TYPE_DISTRIBUTION[player_type] for player_type in PLAYER_TYPES], dtype=float)
+        player_type = self.rng.choice(len(PLAYER_TYPES), size=self.population_size, p=weights / weights.sum())
+        self._reset_players(player_type)
+        self.round_number = 0
+
+    def _reset_players(self, player_type):
+        """
+        Replace the population with fresh players of the given types.
+        """
+        for name, values in _new_players(player_type, self.parameters["ADAPT_INITIAL_ACCEPT_CHANCE"]).items():
+            setattr(self, name, values)
+
+    def __len__(self):
+        return len(self.player_type)
+
+    def _take(self, index):
+        """
+        Keep only the players at the given positions, in that order.
+        """
+        for name in PLAYER_FIELDS:
+            setattr(self, name, getattr(self, name)[index])
+
+    def play_trades(self):
+        """
+        Pair the players at random and resolve every trade of the round at once.
+        Returns the number of trades.
+        """
+        parameters = self.parameters
+        size = len(self)
+        order = self.rng.permutation(size)
+        first, second = order[0:size - 1:2], order[1:size:2]
+
+        # NAIVE and ADAPT players accept with their chance; BAD players always accept
+        accept_chance = np.where(self.player_type == ADAPT, self.trust_level,
+                                 np.where(self.player_type == NAIVE, parameters["NAIVE_ACCEPT_CHANCE"], 1.0))
+        accepts = self.rng.random(size) < accept_chance
+        both_accept = accepts[first] & accepts[second]
+
+        # The first player gets the first chance to scam, as in Settings.make_trade
+        scam_chance = parameters["BAD_SCAM_CHANCE"]
+        first_scams = both_accept & (self.player_type[first] == BAD) & (self.rng.random(len(first)) < scam_chance)
+        second_scams = both_accept & ~first_scams & (self.player_type[second] == BAD) \
+            & (self.rng.random(len(second)) < scam_chance)
+        points = np.where(both_accept, parameters["COOPERATE_SCORE"], parameters["NO_TRADE_SCORE"])
+
+        self._settle(first, first_scams, second_scams, points)
+        self._settle(second, second_scams, first_scams, points)
+        return len(first)
+
+    def _settle(self, players, scams, scammed, points):
+        """
+        Update one side of every trade. A scammed player's score and trade count do not change.
+        """
+        points = np.where(scams, self.parameters["DEFECT_SCORE"], points)
+        scored = ~scammed
+        # Each player trades once per round, so the fancy-indexed updates never collide
+        self.score[players] += np.where(scored, points, 0)
+        self.trades_made[players] += scored
+        self.successful_trades[players] += scored & (points > 0)
+        self.times_scammed_others[players] += scams
+        self.times_scammed[players] += scammed
+
+        victims = players[scammed & (self.player_type[players] == ADAPT)]
+        self.trust_level[victims] = np.maximum(0, self.trust_level[victims] - self.parameters["ADAPT_PENALTY"])
+
+    def run_round(self):
+        """
+        Run a single round of the game
+        """
+        self.round_number += 1
+        self.play_trades()
+        self.apply_evolution()
+
+    def apply_evolution(self):
+        """
+        Apply evolutionary mechanisms: elimination, reproduction, and mutation
+        """
+        parameters = self.parameters
+        survivors, parents = select(self.score, int(self.population_size * parameters["ELIMINATION_THRESHOLD"]),
+                                    int(self.population_size * parameters["REPRODUCTION_RATE"]),
+                                    min(int(self.population_size / 2), len(self)), self.rng)
+        children = self.player_type[parents]
+        self._take(survivors)
+        self._append_players(children)
+
+        mutants, new_types = mutate(len(self), parameters["MUTATION_RATE"], len(PLAYER_TYPES), self.rng)
+        self.player_type[mutants] = new_types
+
+    def _append_players(self, player_type):
+        """
+        Add fresh players of the given types at the end of the population.
+        """
+        for name, values in _new_players(player_type, self.parameters["ADAPT_INITIAL_ACCEPT_CHANCE"]).items():
+            setattr(self, name, np.concatenate([getattr(self, name), values]))
+
+    def run_game(self, num_rounds):
+        """
+        Run the game for a specified number of rounds
+        """
+        for _ in range(num_rounds):
+            self.run_round()
+
+    def get_results(self):
+        """
+        Calculate and return the results of the game, in the same format as Settings.get_results
+        """
+        counts = np.bincount(self.player_type, minlength=len(PLAYER_TYPES))
+        totals = np.bincount(self.player_type, weights=self.score, minlength=len(PLAYER_TYPES))
+        results = {}
+        for index, player_type in enumerate(PLAYER_TYPES):
+            results[player_type] = {
+                "count": int(counts[index]),
+                "total_score": int(totals[index]),
+                "average_score": float(totals[index] / counts[index]) if counts[index] else 0,
+            }
+        return results
+
+    def get_detailed_stats(self):
+        """
+        Return detailed statistics about the current game state, in the same format as Settings.get_detailed_stats
+        """
+        stats = self.get_results()
+        counts = np.bincount(self.player_type, minlength=len(PLAYER_TYPES))
+        for name, key in (("trades_made", "avg_trades"), ("successful_trades", "avg_successful_trades"),
+                          ("times_scammed", "avg_times_scammed"),
+                          ("times_scammed_others", "avg_times_scammed_others")):
+            sums = np.bincount(self.player_type, weights=getattr(self, name), minlength=len(PLAYER_TYPES))
+            for index, player_type in enumerate(PLAYER_TYPES):
+                if counts[index]:
+                    stats[player_type][key] = float(sums[index] / counts[index])
+
+        stats["round_number"] = self.round_number
+        stats["total_players"] = len(self)
+        return stats
+
+
+# Example usage: trade throughput on a large population
+if __name__ == "__main__":
+    population = Population(population_size=1_000_000, seed=0)
+    rounds = 20
+    trades = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        trades += population.play_trades()
+        population.round_number += 1
+    seconds = time.perf_counter() - start
+    print(f"{trades:,} trades in {seconds:.2f}s ({trades / seconds:,.0f} trades/s)")
+    for player_type, data in population.get_detailed_stats().items():
+        if player_type in PLAYER_TYPES:
+            print(f"{player_type}: " + ", ".join(f"{key} = {value:.2f}" for key, value in data.items()))
@@ -1,6 +1,9 @@
 """Game settings and core mechanics"""
 from config import *
 from players import create_initial_population,create_player, Player, BadPlayer, NaivePlayer, AdaptPlayer
+from evolution import mutate, select
+from game_stats import RoundHistory, StatsAccumulator
+import numpy as np
 import random
 
 from config import *
@@ -8,11 +11,15 @@ from players import create_initial_population
 
 class Settings:
     """This class serves as the settings and core mechanics of the game"""
-    def __init__(self, population_size=INITIAL_POPULATION_SIZE):
+    def __init__(self, population_size=INITIAL_POPULATION_SIZE, seed=None):
         """
         Initialize the game settings.
+        The seed makes a game reproducible: it seeds self.random, used for the population, the pairing
+        and the player decisions, and self.rng, used for elimination, reproduction and mutation.
         """
         self.population_size = population_size
+        self.random = random.Random(seed)
+        self.rng = np.random.default_rng(seed)
         self.players = []
         self.round_number = 0
         self.initialize_population()
@@ -22,7 +29,11 @@ class Settings:
         """
         Create a population of players with the initial type distribution.
         """
-        self.players = create_initial_population(self.population_size)
+        self.players = create_initial_population(self.population_size, self.random)
+        self.stats = StatsAccumulator()
+        for player in self.players:
+            self.stats.add_player(player)
+        self.history = RoundHistory()
     
     
     def make_trade(self, player1: Player, player2: Player):
@@ -30,65 +41,86 @@ class Settings:
         Compute the trading system between two players
         """
         try:
-            player1_decision = player1.decide_to_trade(player2)
-            player2_decision = player2.decide_to_trade(player1)
+            player1_decision = player1.decide_to_trade(player2, self.random)
+            player2_decision = player2.decide_to_trade(player1, self.random)
             
             if player1_decision and player2_decision:
-                if isinstance(player1, BadPlayer) and player1.scam_attempt():
-                    player1.update_score(DEFECT_SCORE)
-                    player1.scam_other()
-                    player2.get_scammed(player1)
-                elif isinstance(player2, BadPlayer) and player2.scam_attempt():
-                    player2.update_score(DEFECT_SCORE)
-                    player2.scam_other()
-                    player1.get_scammed(player2)
+                if isinstance(player1, BadPlayer) and player1.scam_attempt(self.random):
+                    self.scam(player1, player2)
+                elif isinstance(player2, BadPlayer) and player2.scam_attempt(self.random):
+                    self.scam(player2, player1)
                 else:
-                    player1.update_score(COOPERATE_SCORE)
-                    player2.update_score(COOPERATE_SCORE)
+                    self.score_trade(player1, COOPERATE_SCORE)
+                    self.score_trade(player2, COOPERATE_SCORE)
             else:
-                player1.update_score(NO_TRADE_SCORE)
-                player2.update_score(NO_TRADE_SCORE)
+                self.score_trade(player1, NO_TRADE_SCORE)
+                self.score_trade(player2, NO_TRADE_SCORE)
         except Exception as e:
             print(f"Error in make_trade: {e}")
             print(f"Player 1: {type(player1).__name__}, Player 2: {type(player2).__name__}")
             raise
 
+    def score_trade(self, player: Player, points):
+        """
+        Give a player the points of a trade and keep the running statistics in step
+        """
+        player.update_score(points)
+        self.stats.record_trade(player, points)
+
+    def scam(self, scammer: Player, victim: Player):
+        """
+        Resolve a trade in which the scammer steals from the victim
+        """
+        self.score_trade(scammer, DEFECT_SCORE)
+        scammer.scam_other()
+        victim.get_scammed(scammer)
+        self.stats.record_scam(scammer, victim)
+
     def run_round(self):
         """
         Run a single round of the game
         """
         self.round_number += 1
-        random.shuffle(self.players)
+        self.random.shuffle(self.players)
         for i in range(0, len(self.players), 2):
             if i + 1 < len(self.players):
                 self.make_trade(self.players[i], self.players[i + 1])
 
         self.apply_evolution()
+        self.history.append(self.round_number, self.stats)
 
     def apply_evolution(self):
         """
         Apply evolutionary mechanisms: elimination, reproduction, and mutation
         """
-        # Sort players by score
-        sorted_players = sorted(self.players, key=lambda p: p.score, reverse=True)
-
-        # Eliminate bottom performers
-        elimination_count = int(self.population_size * ELIMINATION_THRESHOLD)
-        self.players = sorted_players[:-elimination_count]
+        scores = np.fromiter((player.score for player in self.players), dtype=np.int64, count=len(self.players))
+        survivors, parents = select(scores, int(self.population_size * ELIMINATION_THRESHOLD),
+                                    int(self.population_size * REPRODUCTION_RATE),
+                                    min(int(self.population_size / 2), len(self.players)), self.rng)
 
-        # Reproduce top performers
-        reproduction_count = int(self.population_size * REPRODUCTION_RATE)
-        for _ in range(reproduction_count):
-            parent = random.choice(sorted_players[:int(self.population_size/2)])
-            child = create_player(parent.player_type)
+        # Children reuse the objects of eliminated players rather than allocating new ones
+        child_types = [self.players[i].player_type for i in parents]
+        kept = np.zeros(len(self.players), dtype=bool)
+        kept[survivors] = True
+        eliminated = [self.players[i] for i in np.flatnonzero(~kept)]
+        for player in eliminated:
+            self.stats.remove_player(player)
+        self.players = [self.players[i] for i in survivors]
+        for player_type in child_types:
+            if eliminated:
+                child = eliminated.pop()
+                child.reset(player_type)
+            else:
+                child = create_player(player_type)
             self.players.append(child)
+            self.stats.add_player(child)
 
         # Apply mutations
-        for player in self.players:
-            if random.random() < MUTATION_RATE:
-                new_type = random.choice(PLAYER_TYPES)
-                player.__class__ = eval(f"{new_type.capitalize()}Player")
-                player.player_type = new_type
+        mutants, new_types = mutate(len(self.players), MUTATION_RATE, len(PLAYER_TYPES), self.rng)
+        for i, new_type in zip(mutants.tolist(), new_types.tolist()):
+            self.stats.remove_player(self.players[i])
+            self.players[i].set_type(PLAYER_TYPES[new_type])
+            self.stats.add_player(self.players[i])
 
     def run_game(self, num_rounds):
         """
@@ -99,37 +131,15 @@ class Settings:
 
     def get_results(self):
         """
-        Calculate and return the results of the game
+        Return the results of the game, kept up to date by the statistics accumulator
         """
-        results = {player_type: {"count": 0, "total_score": 0} for player_type in PLAYER_TYPES}
-
-        for player in self.players:
-            results[player.player_type]["count"] += 1
-            results[player.player_type]["total_score"] += player.score
-
-        for player_type in results:
-            if results[player_type]["count"] > 0:
-                results[player_type]["average_score"] = results[player_type]["total_score"] / results[player_type]["count"]
-            else:
-                results[player_type]["average_score"] = 0
-
-        return results
+        return self.stats.get_results()
 
     def get_detailed_stats(self):
         """
         Return detailed statistics about the current game state
         """
-        stats = self.get_results()
-        for player_type in PLAYER_TYPES:
-            type_players = [p for p in self.players if p.player_type == player_type]
-            if type_players:
-                stats[player_type].update({
-                    "avg_trades": sum(p.trades_made for p in type_players) / len(type_players),
-                    "avg_successful_trades": sum(p.successful_trades for p in type_players) / len(type_players),
-                    "avg_times_scammed": sum(p.times_scammed for p in type_players) / len(type_players),
-                    "avg_times_scammed_others": sum(p.times_scammed_others for p in type_players) / len(type_players),
-                })
-        
+        stats = self.stats.get_detailed_stats()
         stats["round_number"] = self.round_number
         stats["total_players"] = len(self.players)
         
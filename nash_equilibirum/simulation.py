@@ -0,0 +1,45 @@
+"""Background simulation thread publishing round results to the GUI"""
+import queue
+import threading
+
+from config import *
+
+
+class SimulationWorker(threading.Thread):
+    """This class runs a game on its own thread and publishes its results over a queue"""
+    def __init__(self, settings, num_rounds, publish_interval=STATS_UPDATE_INTERVAL, delay=SIMULATION_SPEED):
+        """
+        Initialize the worker; call start() to run it.
+        Every publish_interval rounds (and after the last one) it puts (round_number, results) on the results queue,
+        and None once it has finished.
+        """
+        super().__init__(daemon=True)
+        self.settings = settings
+        self.num_rounds = num_rounds
+        self.publish_interval = max(1, publish_interval)
+        self.delay = delay
+        self.results = queue.Queue()
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """
+        Ask the worker to stop after the current round.
+        """
+        self._stop_event.set()
+
+    def run(self):
+        """
+        Run the rounds, publishing aggregated results as it goes
+        """
+        try:
+            for round_index in range(1, self.num_rounds + 1):
+                if self._stop_event.is_set():
+                    break
+                self.settings.run_round()
+                if round_index % self.publish_interval == 0 or round_index == self.num_rounds:
+                    self.results.put((self.settings.round_number, self.settings.get_results()))
+                # Optional pacing from config.py; waiting on the event keeps Stop responsive
+                if self.delay and self._stop_event.wait(self.delay):
+                    break
+        finally:
+            self.results.put(None)
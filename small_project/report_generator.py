@@ -1,70 +1,139 @@
+import numpy as np
 import pandas as pd
 import os
 import logging
+import importlib.util
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
 
 logging.basicConfig(level=logging.INFO,format="%(asctime)s %(levelname)s:%(message)s")
 
+# Matches result_df columns named '{period} {metric}', e.g. 'P14 CA-CIB nb of trades'
+PERIOD_COLUMN_PATTERN = r'^(?P<period>P\d+) (?P<metric>.+)$'
+
+class ProcessedData(NamedTuple):
+    """The four DataFrames written by the processing step."""
+    trade_source: pd.DataFrame
+    trade_source_scope: pd.DataFrame
+    result_df: pd.DataFrame
+    issuer_review: pd.DataFrame
+
+# Parquet sidecars are only used when pyarrow is installed
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+PROCESSED_FILES = {
+    'trade_source': "processed_trade_source.xlsx",
+    'trade_source_scope': "processed_trade_source_scope.xlsx",
+    'result_df': "F_S_review_by_ISIN.xlsx",
+    'issuer_review': "F_S_review_by_Issuer.xlsx",
+}
+
+# SQLite export written by the processing step, same names as Structured_project's DATABASE_* settings
+DATABASE_FILENAME = "processed_data.db"
+DATABASE_TABLES = {
+    'trade_source': 'trade_source',
+    'trade_source_scope': 'trade_source_scope',
+    'result_df': 'fs_review_by_isin',
+    'issuer_review': 'fs_review_by_issuer',
+}
+
+def _read_processed_file(excel_path):
+    """
+    Read one processed workbook, preferring its Parquet sidecar when it is newer.
+
+    After a workbook is parsed, a sidecar is written next to it so later runs skip
+    the Excel parse. Sidecars need pyarrow; without it the workbook is always read.
+    """
+    if not PARQUET_AVAILABLE:
+        return pd.read_excel(excel_path)
+
+    sidecar_path = os.path.splitext(excel_path)[0] + ".parquet"
+    if os.path.isfile(sidecar_path) and os.path.getmtime(sidecar_path) >= os.path.getmtime(excel_path):
+        try:
+            return pd.read_parquet(sidecar_path)
+        except Exception as e:
+            logging.warning(f"Could not read sidecar {sidecar_path}, falling back to Excel: {e}")
+
+    df = pd.read_excel(excel_path)
+    try:
+        df.to_parquet(sidecar_path, index=False)
+    except Exception as e:
+        logging.warning(f"Could not write sidecar {sidecar_path}: {e}")
+    return df
+
 def load_processed_data(output_dir):
     """
     Load the processed data from the output directory.
+
+    The four workbooks are parsed concurrently in a process pool, so the load takes
+    about as long as the slowest single file.
     """
     try:
-        trade_source = pd.read_excel(os.path.join(output_dir, "processed_trade_source.xlsx"))
-        trade_source_scope = pd.read_excel(os.path.join(output_dir, "processed_trade_source_scope.xlsx"))
-
-        result_df = pd.read_excel(os.path.join(output_dir, "F_S_review_by_ISIN.xlsx"))
-        issuer_review = pd.read_excel(os.path.join(output_dir, "F_S_review_by_issuer.xlsx"))
+        paths = {name: os.path.join(output_dir, filename) for name, filename in PROCESSED_FILES.items()}
+        with ProcessPoolExecutor(max_workers=len(paths)) as executor:
+            futures = {name: executor.submit(_read_processed_file, path) for name, path in paths.items()}
+            processed_data = ProcessedData(**{name: future.result() for name, future in futures.items()})
         logging.info("Successfully loaded processed data.")
+        return processed_data
 
     except Exception as e:
         logging.error(f"Error loading processed data: {e}")
         raise
 
+def load_processed_data_from_db(output_dir, db_name=DATABASE_FILENAME):
+    """
+    Load the processed data from the SQLite database written next to the Excel outputs.
+    """
+    db_path = os.path.join(output_dir, db_name)
+    try:
+        connection = sqlite3.connect(db_path)
+        try:
+            processed_data = ProcessedData(**{name: pd.read_sql(f"SELECT * FROM {table}", connection)
+                                              for name, table in DATABASE_TABLES.items()})
+        finally:
+            connection.close()
+        logging.info(f"Successfully loaded processed data from {db_path}.")
+        return processed_data
+
+    except Exception as e:
+        logging.error(f"Error loading processed data from database: {e}")
+        raise
+
 def combine_data_for_visualization(trade_source, trade_source_scope, result_df, issuer_review):
     """
     Combines issuer review and result data to create a comprehensive DataFrame for visualization.
+
+    The '{period} {metric}' columns of result_df are parsed once and reshaped to one row
+    per ISIN and period in a single NumPy reshape, then issuer_review is left-merged on
+    ('ISSUER', 'ISSUER_FULLNAME'), keeping every matching review row.
     """
-    # Ensure ISSUER columns are of string type
-    trade_source_scope['ISSUER'] = trade_source_scope['ISSUER'].astype(str)
-    issuer_review['ISSUER'] = issuer_review['ISSUER'].astype(str)
-    result_df['ISSUER'] = result_df['ISSUER'].astype(str)
-
-    # Melt result_df to long format for SI results
-    si_columns = [col for col in result_df.columns if col.endswith('SI')]
-    melted_si_df = result_df.melt(id_vars=['ISIN','ISSUER','ISSUER_FULLNAME'], value_vars=si_columns, var_name='Period',value_name='SI_Result')
-    melted_si_df['Period'] = melted_si_df['Period'].str.replace('SI','')
-
-    #Melt trade columns to long format
-    trade_metrics = ["CA-CIB nb of trades","2.5%xESMA nb of trades","Auction"]
-    melted_trade_df = pd.DataFrame()
-    for metric in trade_metrics:
-        metric_columns = [col for col in result_df.columns if col.endswith(metric)]
-        temp_df =result_df.melt(id_vars=['ISIN','ISSUER','ISSUER_FULLNAME'], value_vars=metric_columns, var_name='Period',value_name=metric)
-        temp_df['Period']= temp_df['Period'].str.replace(f'{metric}','')
-
-        if melted_trade_df.empty:
-            melted_trade_df = temp_df
-        else:
-            melted_trade_df = melted_trade_df.merge(
-                temp_df,
-                on=['ISIN','ISSUER','ISSUER_FULLNAME','Period'],
-                how='outer'
-            )
-
-    #Merge SI results with trade metrics
-    combined_isin_df = melted_si_df.merge(melted_trade_df,
-                                          on=['ISIN','ISSUER','ISSUER_FULLNAME','Period'],
-                                          how='left')
-    
+    id_columns = ['ISIN', 'ISSUER', 'ISSUER_FULLNAME']
+    issuer_keys = ['ISSUER', 'ISSUER_FULLNAME']
+
+    # Parse '{period} {metric}' column names once
+    parsed = result_df.columns.to_series().str.extract(PERIOD_COLUMN_PATTERN).dropna()
+    periods = sorted(parsed['period'].unique(), key=lambda x: int(x[1:]))
+    metrics = list(dict.fromkeys(parsed['metric']))
+
+    # Reshape wide (ISIN x period/metric) to long (ISIN/period x metric) in one step
+    wide = result_df[parsed.index]
+    wide.columns = pd.MultiIndex.from_frame(parsed)
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([periods, metrics], names=['period', 'metric']))
+    long_values = wide.to_numpy(dtype=float).reshape(len(result_df) * len(periods), len(metrics))
+
+    ids = result_df[id_columns].astype({'ISSUER': str})
+    # Repeat by position, so duplicate index labels cannot select extra rows
+    combined_df = ids.iloc[np.repeat(np.arange(len(ids)), len(periods))].reset_index(drop=True)
+    combined_df['Period'] = np.tile(periods, len(result_df))
+    combined_df = pd.concat([combined_df, pd.DataFrame(long_values, columns=metrics)], axis=1)
+    combined_df.rename(columns={'SI': 'SI_Result'}, inplace=True)
+
     #Merge with issuer_review
-    combined_df = combined_isin_df.merge(
-        issuer_review,
-        on=['ISSUER','ISSUER_FULLNAME'],
-        how='left'
-    )
+    combined_df = combined_df.merge(issuer_review.astype({'ISSUER': str}), on=issuer_keys, how='left')
 
     #Add SI obligation flag
-    combined_df['SI_Obligation'] = combined_df['SI_Result'].apply(lambda x:'Yes' if x == 1 else 'No')
+    combined_df['SI_Obligation'] = np.where(combined_df['SI_Result'] == 1, 'Yes', 'No')
     logging.info("Sucessfully combined data for visualization.")
     return combined_df
 
@@ -86,11 +155,14 @@ def main():
         return
 
     try:
-        #Load processed data
-        trade_source, trade_source_scope, result_df, issuer_review = load_processed_data(output_dir)
+        #Load processed data, querying the database when the processing step exported one
+        if os.path.isfile(os.path.join(output_dir, DATABASE_FILENAME)):
+            trade_source, trade_source_scope, result_df, issuer_review = load_processed_data_from_db(output_dir)
+        else:
+            trade_source, trade_source_scope, result_df, issuer_review = load_processed_data(output_dir)
 
         #Combine data for vizua
-        combined_df = combine_data_for_visualization(trade_source_scope, result_df, issuer_review)
+        combined_df = combine_data_for_visualization(trade_source, trade_source_scope, result_df, issuer_review)
 
         #Save the combined data
         save_combined_data(combined_df, output_dir)